@@ -0,0 +1,65 @@
+#!/bin/bash
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+
+set -euo pipefail
+
+if [[ ${1-} == "--coverage" ]]; then
+    coverage_options=(
+        "--cov-branch"
+        "--cov-report=term"
+        "--cov-report=html"
+        "--cov-report=xml"
+        "--cov=src"
+    )
+    shift
+fi
+
+# timings of every benchmark, e.g. to be kept as baseline of later runs
+benchmark_options=("--benchmark-json=benchmark-reports/benchmark.json")
+
+if [[ ${1-} == "--baseline" ]]; then
+    benchmark_options+=("--benchmark-baseline=$2")
+    shift 2
+fi
+
+if [[ ${1-} == "--junit" ]]; then
+    junit_option=("--junitxml=xunit-reports/xunit-result-benchmark.xml")
+    shift
+fi
+
+poetry run pytest \
+    --verbose \
+    "${coverage_options[@]}" \
+    "${benchmark_options[@]}" \
+    "${junit_option[@]}" \
+    tests/benchmark "$@"
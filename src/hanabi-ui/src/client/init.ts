@@ -58,18 +58,33 @@ import {
 
 interface GameState {
     player_id: number;
+    version: number;
     observation: PlayerSpecificObservation;
 }
 
+// changes since `base_version`, only sent if the server runs with --delta-game-state
+interface GameStatePatch {
+    player_id: number;
+    version: number;
+    base_version: number;
+    set: Partial<PlayerSpecificObservation>;
+    append: { [key: string]: unknown[] };
+}
+
 interface GameStateListener {
     (gameState: GameState): unknown;
 }
 
+interface GameStatePatchListener {
+    (patch: GameStatePatch): unknown;
+}
+
 interface GameEndedListener {
     (event: GameEndedEvent): unknown;
 }
 interface ListenEvents {
     game_state: GameStateListener;
+    game_state_patch: GameStatePatchListener;
     game_ended: GameEndedListener;
 }
 
@@ -78,6 +93,7 @@ interface MoveEventListener {
 }
 interface SendEvents {
     move: MoveEventListener;
+    resync: () => unknown;
 }
 
 function empty() {
@@ -192,7 +208,10 @@ function mapFireworks(fireworks: ObservedFireworks): Fireworks {
     };
 }
 
-const playerId = Number.parseInt(window.location.pathname.slice(1)) - 1;
+// the page is served as /<seat> for the default room or as /<room>/<seat>
+const pathSegments = window.location.pathname.split("/").filter(Boolean);
+const room = pathSegments.length > 1 ? pathSegments[0] : "default";
+const playerId = Number.parseInt(pathSegments[pathSegments.length - 1]) - 1;
 
 function mapToStore(observation: PlayerSpecificObservation): StateGameState {
     const nHands = observation.observed_hands.length;
@@ -231,9 +250,27 @@ function mapToStore(observation: PlayerSpecificObservation): StateGameState {
     };
 }
 
+function applyPatch(
+    observation: PlayerSpecificObservation,
+    patch: GameStatePatch,
+): PlayerSpecificObservation {
+    const patched: { [key: string]: unknown } = {
+        ...observation,
+        ...patch.set,
+    };
+    for (const [key, appended] of Object.entries(patch.append)) {
+        patched[key] = [...(patched[key] as unknown[]), ...appended];
+    }
+    return patched as unknown as PlayerSpecificObservation;
+}
+
 let socket: Socket<ListenEvents, SendEvents>;
+let lastObservation: PlayerSpecificObservation | null = null;
+let lastVersion = -1;
 export function init() {
-    socket = io(`ws://${window.location.host}`);
+    socket = io(`ws://${window.location.host}`, {
+        auth: { room, player_id: playerId },
+    });
     socket.on("connect", () => {
         console.log("socket connected: ", socket.connected);
     });
@@ -241,8 +278,22 @@ export function init() {
         if (gameState.player_id !== playerId) {
             return;
         }
-        const toStoreStore = mapToStore(gameState.observation);
-        newStore.set(storedGameState, toStoreStore);
+        lastObservation = gameState.observation;
+        lastVersion = gameState.version;
+        newStore.set(storedGameState, mapToStore(lastObservation));
+    });
+    socket.on("game_state_patch", (patch) => {
+        if (patch.player_id !== playerId) {
+            return;
+        }
+        if (lastObservation === null || lastVersion !== patch.base_version) {
+            // missed a message, ask for the full game state
+            socket.emit("resync");
+            return;
+        }
+        lastObservation = applyPatch(lastObservation, patch);
+        lastVersion = patch.version;
+        newStore.set(storedGameState, mapToStore(lastObservation));
     });
     socket.on("game_ended", (event) => {
         console.log("game ended: ", event);
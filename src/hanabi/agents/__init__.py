@@ -31,42 +31,63 @@
 #
 from __future__ import annotations
 
-from pkg_resources import resource_filename
+from importlib import import_module
+from typing import Iterator
+from typing import Mapping
 
-from hanabi_learning_environment.agents.random_agent import RandomAgent
-from hanabi_learning_environment.agents.simple_agent import SimpleAgent
 from hanabi_learning_environment.rl_env import Agent
 
-from hanabi.agents.external.flawed_agent import FlawedAgent
-from hanabi.agents.external.iggi_agent import IGGIAgent
-from hanabi.agents.external.internal_agent import InternalAgent
-from hanabi.agents.external.internal_discard_oldest import InternalDiscardOldest
-from hanabi.agents.external.internal_probabilistic import InternalProbabilistic
-from hanabi.agents.external.internal_swapped import InternalSwapped
-from hanabi.agents.external.legal_random_agent import LegalRandomAgent
-from hanabi.agents.external.outer_agent import OuterAgent
-from hanabi.agents.external.piers_agent import PiersAgent
-from hanabi.agents.external.van_den_bergh_agent import VanDenBerghAgent
-from hanabi.agents.external.rainbow_agent import TrainedRainbowAgent
-from hanabi.agents.human_agent import HumanPlayer
-
-
-AGENT_MAP = {
-    "human": HumanPlayer,
-    "flawed": FlawedAgent,
-    "iggi": IGGIAgent,
-    "internal": InternalAgent,
-    "discard_oldest": InternalDiscardOldest,
-    "probabilistic": InternalProbabilistic,
-    "swapped": InternalSwapped,
-    "legal_random": LegalRandomAgent,
-    "outer": OuterAgent,
-    "piers": PiersAgent,
-    "random": RandomAgent,
-    "simple": SimpleAgent,
-    "bergh": VanDenBerghAgent,
-    "rainbow": TrainedRainbowAgent,
-}
+
+class AgentRegistry(Mapping[str, "type[Agent]"]):
+    """Agent classes by name, whose modules are only imported once they are looked up."""
+
+    def __init__(self, agents: dict[str, str]) -> None:
+        # name -> "module:class"
+        self._locations = agents
+        self._classes: dict[str, type[Agent]] = {}
+
+    def __getitem__(self, name: str) -> type[Agent]:
+        if (agent := self._classes.get(name)) is None:
+            module, _, class_name = self._locations[name].partition(":")
+            agent = self._classes[name] = getattr(import_module(module), class_name)
+
+        return agent
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def name_of(self, agent: type[Agent]) -> str:
+        """Name under which the agent class is registered, without importing any other agent."""
+        location = f"{agent.__module__}:{agent.__qualname__}"
+        for name, agent_location in self._locations.items():
+            if agent_location == location:
+                return name
+
+        raise AgentNotFoundError
+
+
+# e.g. the rainbow agent imports torch, which alone takes seconds
+AGENT_MAP = AgentRegistry(
+    {
+        "human": "hanabi.agents.human_agent:HumanPlayer",
+        "flawed": "hanabi.agents.external.flawed_agent:FlawedAgent",
+        "iggi": "hanabi.agents.external.iggi_agent:IGGIAgent",
+        "internal": "hanabi.agents.external.internal_agent:InternalAgent",
+        "discard_oldest": "hanabi.agents.external.internal_discard_oldest:InternalDiscardOldest",
+        "probabilistic": "hanabi.agents.external.internal_probabilistic:InternalProbabilistic",
+        "swapped": "hanabi.agents.external.internal_swapped:InternalSwapped",
+        "legal_random": "hanabi.agents.external.legal_random_agent:LegalRandomAgent",
+        "outer": "hanabi.agents.external.outer_agent:OuterAgent",
+        "piers": "hanabi.agents.external.piers_agent:PiersAgent",
+        "random": "hanabi_learning_environment.agents.random_agent:RandomAgent",
+        "simple": "hanabi_learning_environment.agents.simple_agent:SimpleAgent",
+        "bergh": "hanabi.agents.external.van_den_bergh_agent:VanDenBerghAgent",
+        "rainbow": "hanabi.agents.external.rainbow_agent:TrainedRainbowAgent",
+    },
+)
 
 RAINBOW_TYPES = [
     "aiide_all1",
@@ -101,6 +122,9 @@ RAINBOW_TYPES = [
     "selfplay5",
 ]
 
+# the pickled eager networks or the traced ones exported with `hanabi export-rainbow`
+RAINBOW_BACKENDS = ["eager", "torchscript", "quantized"]
+
 class AgentNotFoundError(Exception):
     def __init__(self) -> None:
         super().__init__("Specified Agent was not found!")
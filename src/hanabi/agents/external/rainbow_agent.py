@@ -33,9 +33,9 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import functools
 import logging
 from pathlib import Path
-from pkg_resources import resource_filename
 
 import numpy as np
 
@@ -44,6 +44,71 @@ import torch
 from hanabi_learning_environment import rl_env
 
 
+DEFAULT_CHECKPOINTS_PATH = Path(__file__).parent / "rainbow_checkpoints_torch"
+
+# checkpoint suffix of every hanabi.agents.RAINBOW_BACKENDS, the exported ones are written by hanabi.agents.rainbow_export
+BACKEND_SUFFIXES = {
+    "eager": ".pt",
+    "torchscript": ".ts.pt",
+    "quantized": ".int8.ts.pt",
+}
+
+# number of networks kept loaded in the process, shared by all agents using them
+NETWORK_CACHE_SIZE = 8
+
+
+def network_path(checkpoints_path, rainbow_type, backend="eager"):
+    """Get the file of a checkpoint for a backend
+
+    Parameters
+    ----------
+    checkpoints_path : Path
+        Directory of the checkpoints
+    rainbow_type : str
+        Type of the trained agent, one of hanabi.agents.RAINBOW_TYPES
+    backend : str
+        One of hanabi.agents.RAINBOW_BACKENDS
+
+    Returns
+    -------
+    Path
+        Checkpoint file, the exported ones share the name of the eager one
+    """
+    return Path(checkpoints_path).joinpath(f"{rainbow_type}{BACKEND_SUFFIXES[backend]}")
+
+
+@functools.lru_cache(maxsize=NETWORK_CACHE_SIZE)
+def load_network(network_filename, backend="eager"):
+    """Load a network once per process and prepare it for inference
+
+    Parameters
+    ----------
+    network_filename : str
+        Resolved path of the checkpoint
+    backend : str
+        One of hanabi.agents.RAINBOW_BACKENDS
+
+    Returns
+    -------
+    torch.nn.Module
+        Network in eval mode without gradients, shared by every caller
+    """
+    logging.info("Loading agent network %s", network_filename)
+    if backend == "eager":
+        network = torch.load(network_filename)
+    else:
+        network = torch.jit.load(network_filename)
+    network.eval()
+    for parameter in network.parameters():
+        parameter.requires_grad_(False)
+    return network
+
+
+@functools.lru_cache(maxsize=1)
+def _card_knowledge_environment():
+    return rl_env.make(environment_name="Hanabi-Full-CardKnowledge", num_players=2, pyhanabi_path=None)
+
+
 class TrainedRainbowAgent:
     """Loads a pre-trained Rainbow Agent from disk"""
 
@@ -53,13 +118,12 @@ class TrainedRainbowAgent:
         checkpoints_path: Path = None,
     ) -> None:
         if checkpoints_path is None:
-            checkpoints_path = resource_filename(__name__, "rainbow_checkpoints_torch/")
-        network_filename = Path(checkpoints_path).joinpath(f"{config['rainbow_type']}.pt")
-        logging.info("Loading agent network %s", network_filename)
-        self.network = torch.load(network_filename)
-        self.environment = rl_env.make(
-            environment_name="Hanabi-Full-CardKnowledge", num_players=2, pyhanabi_path=None
-        )
+            checkpoints_path = DEFAULT_CHECKPOINTS_PATH
+        # configurations of older recordings have no backend
+        backend = config.get("rainbow_backend", "eager")
+        network_filename = network_path(checkpoints_path, config["rainbow_type"], backend)
+        self.network = load_network(str(network_filename.resolve()), backend)
+        self.environment = _card_knowledge_environment()
         self.num_actions = self.environment.num_moves()  # 20 moved
         self.num_atoms = 51  # TODO understand settings
         self.vmax = 25  # TODO understand settings
@@ -67,6 +131,11 @@ class TrainedRainbowAgent:
         logging.debug("Agent loaded")
         logging.debug("N moved in environment: %d", self.num_actions)
 
+    def warm_up(self):
+        """Run a forward pass, so that the first real move does not pay for the lazy initialization of torch"""
+        with torch.inference_mode():
+            self.network(torch.zeros((1, *self.environment.vectorized_observation_shape())))
+
     def act(self, observation):
         """Select action based on current environment observation
 
@@ -78,32 +147,41 @@ class TrainedRainbowAgent:
 
         Returns
         -------
-        _type_
-            _description_
+        dict
+            Chosen move
+        """
+        return self.batch_act([observation])[0]
+
+    def batch_act(self, observations):
+        """Select actions for several observations with a single forward pass
+
+        Parameters
+        ----------
+        observations : list of dict
+            Environment observations containing entries "vectorized" and
+            "legal_moves_as_int", e.g. of different games.
+
+        Returns
+        -------
+        list of dict
+            Chosen move for every observation
         """
-        # TODO the original act function is equivalent to DQNAgent._select_action()?
-        illegal_actions = self.get_illegal_actions(
-            observation["legal_moves_as_int"], self.num_actions
-        )
-        logging.debug("Legal moves: %s", observation["legal_moves"])
-        flat_distribution_logits = self.network(torch.Tensor(observation["vectorized"]))
-        distribution_logits = flat_distribution_logits.reshape(
-            [-1, self.num_actions, self.num_atoms]
-        )
-        distribution_probs = distribution_logits.softmax(dim=2)
-        q = distribution_probs.mul(self.support).sum(dim=2)
-        # Compute argmax assuming illegal actions is a bool tensor, True if
-        # action is illegal.
-        illegal_mask = (-torch.inf * torch.Tensor(illegal_actions)).nan_to_num(
-            nan=0, neginf=-torch.inf
-        )
-        q_argmax = q.add(illegal_mask).argmax(dim=1)
-        logging.info(
-            "Chosen move: %d (%s)",
-            q_argmax[0],
-            self.environment.game.get_move(int(q_argmax)).to_dict(),
-        )
-        return self.environment.game.get_move(int(q_argmax)).to_dict()
+        with torch.inference_mode():
+            vectorized = torch.tensor([observation["vectorized"] for observation in observations], dtype=torch.float32)
+            flat_distribution_logits = self.network(vectorized)
+            distribution_logits = flat_distribution_logits.reshape([-1, self.num_actions, self.num_atoms])
+            distribution_probs = distribution_logits.softmax(dim=2)
+            q = distribution_probs.mul(self.support).sum(dim=2)
+            # illegal actions can never be the maximum
+            illegal_mask = torch.full((len(observations), self.num_actions), -torch.inf)
+            for row, observation in enumerate(observations):
+                illegal_mask[row, observation["legal_moves_as_int"]] = 0
+            q_argmax = q.add(illegal_mask).argmax(dim=1).tolist()
+
+        moves = [self.environment.game.get_move(action).to_dict() for action in q_argmax]
+        for action, move in zip(q_argmax, moves):
+            logging.debug("Chosen move: %d (%s)", action, move)
+        return moves
 
     def get_illegal_actions(self, legal_moves, action_dim):
         """Returns illegal moves formatted as boolean array.
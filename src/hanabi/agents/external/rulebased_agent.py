@@ -14,29 +14,41 @@
 """Simple Agent."""
 from __future__ import annotations
 
+from hanabi.agents.external.ruleset import BeliefTracker
+from hanabi.agents.external.ruleset import ObservationContext
 from hanabi.agents.external.ruleset import Ruleset
 
 
 class RulebasedAgent:
     """Agent that applies a simple heuristic."""
 
-    def __init__(self, rules) -> None:
+    def __init__(self, rules, track_beliefs=True) -> None:
         self.rules = rules
+        # discarded cards are counted across turns instead of rescanning the discard pile every turn
+        self.beliefs = BeliefTracker() if track_beliefs else None
         self.totalCalls = 0
         self.histogram = [0 for i in range(len(rules) + 1)]
 
     def get_move(self, observation):
         if observation["current_player_offset"] == 0:
-            for index, rule in enumerate(self.rules):
-                action = rule(observation)
-                if action is not None:
-                    # print(rule)
-                    self.histogram[index] += 1
-                    self.totalCalls += 1
-                    return action
-            self.histogram[-1] += 1
-            self.totalCalls += 1
-            return Ruleset.legal_random(observation)
+            # all rules share whatever they derive from the observation
+            if self.beliefs is not None:
+                self.beliefs.update(observation)
+            observation = ObservationContext(observation, self.beliefs)
+            try:
+                for index, rule in enumerate(self.rules):
+                    action = rule(observation)
+                    if action is not None:
+                        # print(rule)
+                        self.histogram[index] += 1
+                        self.totalCalls += 1
+                        return action
+                self.histogram[-1] += 1
+                self.totalCalls += 1
+                return Ruleset.legal_random(observation)
+            finally:
+                # otherwise the observation is only freed by the cyclic garbage collector
+                observation.release()
         return None
 
     def print_histogram(self):
@@ -15,6 +15,8 @@
 from __future__ import annotations
 
 import random
+from collections.abc import Mapping
+from functools import cached_property
 
 import numpy as np
 
@@ -25,6 +27,9 @@ global colors
 colors = ["R", "Y", "G", "W", "B"]
 # ranks = [1,2,3,4,5]
 num_in_deck_by_rank = [3, 2, 2, 2, 1]  # Note: rank is zero-based
+card_counts_by_rank = np.array(num_in_deck_by_rank)
+color_index = {color: index for index, color in enumerate(colors)}
+rank_indices = np.arange(len(num_in_deck_by_rank))
 
 
 # Note: depending on the object calling, card could either be a dict eg {'color':'R','rank':0} or a HanabiCard instance with c.color() and c.rank() methods
@@ -58,7 +63,7 @@ def useless_card(card, fireworks, max_fireworks):
 
 
 def get_plausible_cards(observation, player_offset, hand_index):
-    card_knowledge = observation["pyhanabi"].card_knowledge()[player_offset]
+    card_knowledge = ObservationContext.of(observation).card_knowledge[player_offset]
     # print(card_knowledge)
     hidden_card = card_knowledge[hand_index]
     # print(hidden_card)
@@ -88,6 +93,10 @@ def get_plausible_cards(observation, player_offset, hand_index):
 
 
 def get_visible_cards(observation, player_offset):
+    return list(ObservationContext.of(observation).visible_cards(player_offset))
+
+
+def _get_visible_cards(observation, player_offset):
     visible_cards = []
     for other_player in range(1, observation["num_players"]):
         if other_player != player_offset:
@@ -108,119 +117,257 @@ def get_visible_cards(observation, player_offset):
 
 
 def get_card_playability(observation, player_offset=0):
-    visible_cards = get_visible_cards(observation, player_offset)
-    # print(observation)
-    # print(visible_cards
-    my_hand_size = len(observation["observed_hands"][player_offset])
-    playability_array = np.zeros(my_hand_size)
-    for hand_index in range(my_hand_size):
-        total_possibilities = 0
-        playable_possibilities = 0
-        plausible_cards = get_plausible_cards(observation, player_offset, hand_index)
-        for plausible in plausible_cards:
-            num_in_deck = num_in_deck_by_rank[plausible.rank()]
-            for visible in visible_cards:
-                # print(str(plausible) + " " + str(visible))
-                # print(visible['color'])
-                # print(plausible.color())
-                # print(visible['rank'])
-                # print(plausible.rank())
-                if visible["color"] == colors[plausible.color()] and visible["rank"] == plausible.rank():
-                    num_in_deck -= 1
-            total_possibilities += num_in_deck
-            if playable_card(plausible, observation["fireworks"]):
-                playable_possibilities += num_in_deck
-        playability_array[hand_index] = playable_possibilities / total_possibilities
-
-        # for plausible in plausible_cards:
-        #   num_in_deck = num_in_deck_by_rank[plausible.rank()]
-        #   possible_in_deck += num_in_deck
-
-        #   for other_player in range (1,observation['num_players']):
-        #     if other_player != player_offset
-        #       their_hand = observation['observed_hands'][other_player]:
-        #         for card in their_hand:
-        #           if card['color'] == plausible.color() and card['rank'] == plausible.rank():
-        #             possible_in_deck -=1:
-        # print(num_in_deck)
-        # for player in range(1,observation['num_players']):
-        #   if player!= player_offset:
-
-    # print (observation['pyhanabi'].card_knowledge())
-    # print(player_hints)
-    return playability_array
+    return ObservationContext.of(observation).hand_belief(player_offset).playability
 
 
 def get_probability_useless(observation, player_offset=0):
-    visible_cards = get_visible_cards(observation, player_offset)
-    # print(observation)
-    my_hand_size = len(observation["observed_hands"][player_offset])
-    probability_useless = np.zeros(my_hand_size)
-    max_fireworks = get_max_fireworks(observation)
-    for hand_index in range(my_hand_size):
-        total_possibilities = 0
-        useless_possibilities = 0
-        plausible_cards = get_plausible_cards(observation, player_offset, hand_index)
-        for plausible in plausible_cards:
-            num_in_deck = num_in_deck_by_rank[plausible.rank()]
-            for visible in visible_cards:
-                # print(str(plausible) + " " + str(visible))
-                # print(visible['color'])
-                # print(plausible.color())
-                # print(visible['rank'])
-                # print(plausible.rank())
-                if visible["color"] == colors[plausible.color()] and visible["rank"] == plausible.rank():
-                    num_in_deck -= 1
-            total_possibilities += num_in_deck
-            if useless_card(plausible, observation["fireworks"], max_fireworks):
-                useless_possibilities += num_in_deck
-        probability_useless[hand_index] = useless_possibilities / total_possibilities
-
-        # for plausible in plausible_cards:
-        #   num_in_deck = num_in_deck_by_rank[plausible.rank()]
-        #   possible_in_deck += num_in_deck
-
-        #   for other_player in range (1,observation['num_players']):
-        #     if other_player != player_offset
-        #       their_hand = observation['observed_hands'][other_player]:
-        #         for card in their_hand:
-        #           if card['color'] == plausible.color() and card['rank'] == plausible.rank():
-        #             possible_in_deck -=1:
-        # print(num_in_deck)
-        # for player in range(1,observation['num_players']):
-        #   if player!= player_offset:
-
-    # print (observation['pyhanabi'].card_knowledge())
-    # print(player_hints)
-    return probability_useless
+    return ObservationContext.of(observation).hand_belief(player_offset).probability_useless
 
 
 # Note: Fireworks goes from 0 to 5, whereas rank goes from 0 to 4
 def get_max_fireworks(observation):
-    discarded_cards = {}
-    max_fireworks = {"R": 5, "Y": 5, "G": 5, "W": 5, "B": 5}
-    for card in observation["discard_pile"]:
-        color = card["color"]
-        rank = card["rank"]
-        label = str(color) + str(rank)
-        if label not in discarded_cards:
-            discarded_cards[label] = 1
+    return ObservationContext.of(observation).max_fireworks
+
+
+def _color_rank_indices(cards):
+    color_indices = np.fromiter((color_index[card["color"]] for card in cards), dtype=np.intp, count=len(cards))
+    rank_indices = np.fromiter((card["rank"] for card in cards), dtype=np.intp, count=len(cards))
+    return color_indices, rank_indices
+
+
+def get_discarded_counts(observation):
+    """Colors x ranks array of how often every card was discarded or misplayed."""
+    discarded = np.zeros((len(colors), len(num_in_deck_by_rank)), dtype=np.int64)
+    np.add.at(discarded, _color_rank_indices(observation["discard_pile"]), 1)
+    return discarded
+
+
+def _max_fireworks_from_discarded(discarded):
+    exhausted = discarded >= card_counts_by_rank
+    return np.where(exhausted.any(axis=1), exhausted.argmax(axis=1), len(num_in_deck_by_rank))
+
+
+def get_max_fireworks_array(observation):
+    """Highest reachable firework per color, in the order of `colors`, lowered by ranks discarded entirely."""
+    return _max_fireworks_from_discarded(get_discarded_counts(observation))
+
+
+def get_fireworks_array(observation):
+    fireworks = observation["fireworks"]
+    return np.array([fireworks.get(color, 0) for color in colors])
+
+
+class BeliefTracker:
+    """
+    Discarded cards and fireworks of one game, kept up to date across the turns of an agent.
+
+    Every update only consumes the events since the previous one, so the cost of a decision
+    does not grow with the discard pile. Whenever the counts disagree with the observation,
+    e.g. for the first turn, a new game or an observation without a complete event log, the
+    tracker rebuilds them from the discard pile instead.
+    """
+
+    def __init__(self):
+        self._rebuild_from(None)
+
+    def _rebuild_from(self, observation):
+        if observation is None:
+            self.discarded = np.zeros((len(colors), len(num_in_deck_by_rank)), dtype=np.int64)
+            self._fireworks = np.zeros(len(colors), dtype=np.int64)
+            self._events = 0
         else:
-            discarded_cards[label] += 1
-    for label in discarded_cards:
-        color = label[0]
-        rank = int(label[1])
-        number_in_discard = discarded_cards[label]
-        if number_in_discard >= num_in_deck_by_rank[rank] and max_fireworks[color] >= rank:
-            max_fireworks[color] = rank
-    return max_fireworks
-
-    #   print(label)
-    #   print(card)
-    # for color in colors:
-    #   current_value = fireworks[color]
-    #   print(current_value)
-    #   max_possible = 5
+            self.discarded = get_discarded_counts(observation)
+            self._fireworks = get_fireworks_array(observation)
+            self._events = len(observation.get("event_log") or ())
+        self._discards = int(self.discarded.sum())
+        self.max_fireworks = _max_fireworks_from_discarded(self.discarded)
+
+    def _consume(self, event):
+        move = event["move"]
+        if move["action_type"] not in ("PLAY", "DISCARD"):
+            return True
+
+        card = move.get("played_card")
+        if card is None:
+            return False
+
+        color, rank = color_index[card["color"]], card["rank"]
+        if move["action_type"] == "PLAY" and self._fireworks[color] == rank:
+            self._fireworks[color] += 1
+            return True
+
+        self.discarded[color, rank] += 1
+        self._discards += 1
+        if self.discarded[color, rank] >= num_in_deck_by_rank[rank]:
+            self.max_fireworks[color] = min(self.max_fireworks[color], rank)
+        return True
+
+    def update(self, observation):
+        events = observation.get("event_log")
+        consistent = events is not None and len(events) >= self._events
+        if consistent:
+            for event in events[self._events :]:
+                if not self._consume(event):
+                    consistent = False
+                    break
+            self._events = len(events)
+
+        if (
+            not consistent
+            or self._discards != len(observation["discard_pile"])
+            or not np.array_equal(self._fireworks, get_fireworks_array(observation))
+        ):
+            self._rebuild_from(observation)
+
+
+class ObservationContext(Mapping):
+    """
+    Observation of a single decision, shared by all rules a RulebasedAgent evaluates for it.
+
+    It reads like the observation it wraps and memoizes everything the rules derive from it,
+    so each quantity is computed at most once per decision however many rules ask for it.
+    Helpers called with a plain observation wrap it in a context of their own. With an up to
+    date BeliefTracker the discard pile is not scanned at all.
+    """
+
+    def __init__(self, observation, beliefs=None):
+        self.observation = observation
+        self.beliefs = beliefs
+        self._visible_cards = {}
+        self._hand_beliefs = {}
+
+    @classmethod
+    def of(cls, observation):
+        return observation if isinstance(observation, cls) else cls(observation)
+
+    def __getitem__(self, key):
+        return self.observation[key]
+
+    def __iter__(self):
+        return iter(self.observation)
+
+    def __len__(self):
+        return len(self.observation)
+
+    @cached_property
+    def card_knowledge(self):
+        return self.observation["pyhanabi"].card_knowledge()
+
+    @cached_property
+    def fireworks_array(self):
+        return get_fireworks_array(self.observation)
+
+    @cached_property
+    def discarded(self):
+        if self.beliefs is not None:
+            return self.beliefs.discarded
+        return get_discarded_counts(self.observation)
+
+    @cached_property
+    def max_fireworks_array(self):
+        if self.beliefs is not None:
+            return self.beliefs.max_fireworks
+        return _max_fireworks_from_discarded(self.discarded)
+
+    @cached_property
+    def max_fireworks(self):
+        return dict(zip(colors, self.max_fireworks_array.tolist()))
+
+    def visible_cards(self, player_offset=0):
+        if player_offset not in self._visible_cards:
+            self._visible_cards[player_offset] = _get_visible_cards(self.observation, player_offset)
+        return self._visible_cards[player_offset]
+
+    def hand_belief(self, player_offset=0):
+        if player_offset not in self._hand_beliefs:
+            self._hand_beliefs[player_offset] = HandBelief(self, player_offset)
+        return self._hand_beliefs[player_offset]
+
+    def release(self):
+        """Drop the memoized hand beliefs, which refer back to the context, once the decision is made."""
+        self._hand_beliefs.clear()
+
+
+class HandBelief:
+    """
+    What a player can know about their own hand, as colors x ranks arrays.
+
+    `remaining` counts the copies of every card the player cannot see in the other hands, the
+    discard pile or on the fireworks, `plausible` masks the cards every slot of the hand could
+    still be according to the hints. Probabilities for the whole hand are computed from these
+    arrays at once instead of per plausible card, each array is only built once a rule needs it.
+    """
+
+    def __init__(self, observation, player_offset=0):
+        self._context = ObservationContext.of(observation)
+        self._player_offset = player_offset
+
+    @property
+    def fireworks(self):
+        return self._context.fireworks_array
+
+    @property
+    def max_fireworks(self):
+        return self._context.max_fireworks_array
+
+    @cached_property
+    def remaining(self):
+        observation = self._context
+        remaining = card_counts_by_rank - self._context.discarded
+
+        visible_cards = []
+        for other_player in range(1, observation["num_players"]):
+            if other_player != self._player_offset:
+                visible_cards.extend(observation["observed_hands"][other_player])
+        np.subtract.at(remaining, _color_rank_indices(visible_cards), 1)
+
+        # every rank below a firework was played onto it
+        remaining -= rank_indices < self.fireworks[:, np.newaxis]
+        return remaining
+
+    @cached_property
+    def plausible(self):
+        card_knowledge = self._context.card_knowledge[self._player_offset]
+        hand_size = len(self._context["observed_hands"][self._player_offset])
+
+        plausible = np.zeros((hand_size, len(colors), len(num_in_deck_by_rank)), dtype=bool)
+        for hand_index in range(hand_size):
+            hidden_card = card_knowledge[hand_index]
+            plausible_colors = [hidden_card.color_plausible(color) for color in range(len(colors))]
+            plausible_ranks = [hidden_card.rank_plausible(rank) for rank in range(len(num_in_deck_by_rank))]
+            plausible[hand_index] = np.outer(plausible_colors, plausible_ranks)
+
+        return plausible
+
+    @cached_property
+    def playable(self):
+        return rank_indices == self.fireworks[:, np.newaxis]
+
+    @cached_property
+    def useless(self):
+        return (rank_indices < self.fireworks[:, np.newaxis]) | (rank_indices >= self.max_fireworks[:, np.newaxis])
+
+    def _probability(self, cards):
+        possibilities = self.plausible * self.remaining
+        return (possibilities * cards).sum(axis=(1, 2)) / possibilities.sum(axis=(1, 2))
+
+    @cached_property
+    def playability(self):
+        return self._probability(self.playable)
+
+    @cached_property
+    def probability_useless(self):
+        return self._probability(self.useless)
+
+    @cached_property
+    def certainly_playable(self):
+        """Slots whose every plausible card is playable, without considering which cards are left."""
+        return ~(self.plausible & ~self.playable).any(axis=(1, 2))
+
+    @cached_property
+    def eventually_playable(self):
+        """Slots which could be a card that can still be played at some point."""
+        return (self.plausible & (rank_indices < self.max_fireworks[:, np.newaxis])).any(axis=(1, 2))
 
 
 class Ruleset:
@@ -247,18 +394,9 @@ class Ruleset:
             if rank is not None and rank < min(fireworks.values()):
                 return {"action_type": "DISCARD", "card_index": card_index}
 
-        for card_index in range(len(observation["observed_hands"][0])):
-            plausible_cards = get_plausible_cards(observation, 0, card_index)
-            eventually_playable = False
-            for card in plausible_cards:
-                color = colors[card.color()]
-                rank = card.rank()
-                # if (rank>=fireworks[color] and rank<max_fireworks[color]):
-                if rank < max_fireworks[color]:
-                    eventually_playable = True
-                    break
-            if not eventually_playable:
-                return {"action_type": "DISCARD", "card_index": card_index}
+        never_playable = np.flatnonzero(~ObservationContext.of(observation).hand_belief().eventually_playable)
+        if len(never_playable) > 0:
+            return {"action_type": "DISCARD", "card_index": int(never_playable[0])}
         return None
 
     # Note: this rule only looks at the next player on purpose, for compatibility with the Fossgalaxy implementation. Prioritizes color
@@ -310,15 +448,11 @@ class Ruleset:
         #   action = {'action_type': 'PLAY', 'card_index': card_index}
         #   return action
 
-        for card_index, _card in enumerate(observation["card_knowledge"][0]):
-            plausible_cards = get_plausible_cards(observation, PLAYER_OFFSET, card_index)
-            definetly_playable = True
-            for plausible in plausible_cards:
-                if not playable_card(plausible, fireworks):
-                    definetly_playable = False
-                    break
-            if definetly_playable:
-                return {"action_type": "PLAY", "card_index": card_index}
+        definetly_playable = np.flatnonzero(
+            ObservationContext.of(observation).hand_belief(PLAYER_OFFSET).certainly_playable
+        )
+        if len(definetly_playable) > 0:
+            return {"action_type": "PLAY", "card_index": int(definetly_playable[0])}
         return None
 
     @staticmethod
@@ -0,0 +1,174 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from concurrent.futures import Future
+from logging import getLogger
+from queue import Empty
+from queue import Queue
+from threading import Lock
+from threading import Thread
+from time import monotonic
+from typing import Any
+from typing import NamedTuple
+from typing import Protocol
+from typing import runtime_checkable
+
+from hanabi_learning_environment.rl_env import Agent
+
+from hanabi.moves import Move
+from hanabi.observations import AgentObservation
+
+
+log = getLogger(__name__)
+
+
+@runtime_checkable
+class BatchActingAgent(Protocol):
+    """Agent that chooses the moves of many observations at once with its `network`."""
+
+    network: Any
+
+    def batch_act(self, observations: list[AgentObservation]) -> list[Move]:
+        ...
+
+
+def act_batched(agents: list[Agent], observations: list[AgentObservation]) -> list[Move]:
+    """Let every agent choose the move for its observation, with a single `batch_act` for all agents of a network."""
+    moves: dict[int, Move] = {}
+    by_network: dict[int, list[int]] = {}
+    for idx, (agent, observation) in enumerate(zip(agents, observations)):
+        if isinstance(agent, BatchActingAgent):
+            by_network.setdefault(id(agent.network), []).append(idx)
+        else:
+            moves[idx] = agent.act(observation)
+
+    for indices in by_network.values():
+        batch_moves = agents[indices[0]].batch_act([observations[idx] for idx in indices])
+        moves.update(zip(indices, batch_moves))
+
+    return [moves[idx] for idx in range(len(agents))]
+
+
+class _Request(NamedTuple):
+    agent: BatchActingAgent
+    observation: AgentObservation
+    future: Future[Move]
+
+
+class InferenceService:
+    """
+    Batches the moves of agents with neural networks across concurrently running games.
+
+    Requests are collected for at most `max_delay` seconds after the first one arrived or until
+    `max_batch_size` are pending. All requests for the same network are then answered by a single
+    `batch_act` of one of its agents, on a background thread instead of the caller's event loop.
+    """
+
+    def __init__(self, *, max_delay: float = 0.002, max_batch_size: int = 64) -> None:
+        self._max_delay = max_delay
+        self._max_batch_size = max_batch_size
+        self._requests: Queue[_Request | None] = Queue()
+        self._thread = Thread(target=self._run, name="inference-service", daemon=True)
+        self._thread.start()
+
+    def submit(self, agent: BatchActingAgent, observation: AgentObservation) -> Future[Move]:
+        future: Future[Move] = Future()
+        self._requests.put(_Request(agent, observation, future))
+        return future
+
+    def close(self) -> None:
+        """Answer the pending requests and stop the service."""
+        self._requests.put(None)
+        self._thread.join()
+
+    def _collect(self, first: _Request) -> tuple[list[_Request], bool]:
+        batch = [first]
+        deadline = monotonic() + self._max_delay
+
+        while len(batch) < self._max_batch_size and (timeout := deadline - monotonic()) > 0:
+            try:
+                request = self._requests.get(timeout=timeout)
+            except Empty:  # noqa: PERF203
+                break
+
+            if request is None:
+                return batch, True
+            batch.append(request)
+
+        return batch, False
+
+    @staticmethod
+    def _answer_network(requests: list[_Request]) -> None:
+        try:
+            moves = requests[0].agent.batch_act([request.observation for request in requests])
+        except Exception as e:  # noqa: BLE001
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        for request, move in zip(requests, moves):
+            request.future.set_result(move)
+
+    def _answer(self, batch: list[_Request]) -> None:
+        by_network: dict[int, list[_Request]] = {}
+        for request in batch:
+            by_network.setdefault(id(request.agent.network), []).append(request)
+
+        for requests in by_network.values():
+            self._answer_network(requests)
+
+        log.debug("Answered %s requests with %s forward passes", len(batch), len(by_network))
+
+    def _run(self) -> None:
+        closed = False
+        while not closed:
+            if (first := self._requests.get()) is None:
+                return
+
+            batch, closed = self._collect(first)
+            self._answer(batch)
+
+
+_service: InferenceService | None = None
+_service_lock = Lock()
+
+
+def inference_service() -> InferenceService:
+    """Get the inference service shared by all games of this process."""
+    global _service  # noqa: PLW0603
+
+    with _service_lock:
+        if _service is None:
+            _service = InferenceService()
+
+        return _service
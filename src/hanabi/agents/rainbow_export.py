@@ -0,0 +1,191 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import time
+
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+from typing import Callable
+
+import torch
+
+from hanabi.agents.external.rainbow_agent import DEFAULT_CHECKPOINTS_PATH
+from hanabi.agents.external.rainbow_agent import TrainedRainbowAgent
+from hanabi.agents.external.rainbow_agent import load_network
+from hanabi.agents.external.rainbow_agent import network_path
+from hanabi.config.export import RainbowExportConfig
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.game import default_game_config
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import sanitize_move
+from hanabi.observations import AgentObservation
+
+
+log = getLogger(__name__)
+
+
+@dataclass()
+class RainbowExportReport:
+    rainbow_type: str
+    backend: str
+    exported_file: Path
+    moves: int
+    matching_moves: int
+    # seconds per move of single and of batched moves, for the eager and the exported network
+    eager_latency: float
+    exported_latency: float
+    eager_batched_latency: float
+    exported_batched_latency: float
+
+    @property
+    def parity(self) -> float:
+        return self.matching_moves / self.moves if self.moves else 1.0
+
+    def log_summary(self) -> None:
+        log.info(
+            "Exported %s to %s: %d of %d moves (%.2f%%) match the eager network",
+            self.rainbow_type,
+            self.exported_file,
+            self.matching_moves,
+            self.moves,
+            100 * self.parity,
+        )
+        log.info(
+            "Single moves: %.0fus eager | %.0fus %s, batched moves: %.0fus eager | %.0fus %s",
+            1e6 * self.eager_latency,
+            1e6 * self.exported_latency,
+            self.backend,
+            1e6 * self.eager_batched_latency,
+            1e6 * self.exported_batched_latency,
+            self.backend,
+        )
+
+
+def _rainbow_config(rainbow_type: str, backend: str = "eager") -> HanabiGameConfig:
+    # the networks were trained on the full two player game
+    return {**default_game_config(2), "hand_size": 5, "rainbow_type": rainbow_type, "rainbow_backend": backend}
+
+
+def _parity_observations(agent: TrainedRainbowAgent, rainbow_type: str, games: int) -> list[AgentObservation]:
+    """Collect the observations of games in which the agent plays against itself."""
+    observations = []
+    for seed in range(games):
+        config: HanabiGameConfig = {**_rainbow_config(rainbow_type), "seed": seed}
+        game = SSEHanabiGame(config, [TrainedRainbowAgent] * config["players"])
+        while not game.is_terminal():
+            observation = game.get_agent_observation(game.current_player)
+            observations.append(observation)
+            game.make_move(sanitize_move(agent.act(observation)))
+
+    return observations
+
+
+def _seconds_per_move(act: Callable[[list[AgentObservation]], Any], observations: list[AgentObservation]) -> float:
+    start = time.perf_counter()
+    act(observations)
+    return (time.perf_counter() - start) / len(observations)
+
+
+def export_network(network: torch.nn.Module, input_size: int, *, quantize: bool) -> torch.jit.ScriptModule:
+    """Trace a network for inference without python, optionally with int8 weights for its linear layers."""
+    if quantize:
+        network = torch.ao.quantization.quantize_dynamic(network, {torch.nn.Linear}, dtype=torch.qint8)
+
+    with torch.no_grad():
+        traced: torch.jit.ScriptModule = torch.jit.trace(  # type: ignore[no-untyped-call]
+            network,
+            torch.zeros((1, input_size)),
+        )
+
+    return traced
+
+
+def export_rainbow(
+    rainbow_type: str,
+    backend: str,
+    *,
+    checkpoints_path: Path = DEFAULT_CHECKPOINTS_PATH,
+    parity_games: int = 10,
+) -> RainbowExportReport:
+    """Export the checkpoint of a rainbow type next to it and compare its moves and speed to the eager one."""
+    eager = TrainedRainbowAgent(_rainbow_config(rainbow_type), checkpoints_path)
+    exported_file = network_path(checkpoints_path, rainbow_type, backend)
+
+    input_size = eager.environment.vectorized_observation_shape()[0]
+    exported_network = export_network(eager.network, input_size, quantize=backend == "quantized")
+    torch.jit.save(exported_network, str(exported_file))  # type: ignore[no-untyped-call]
+    # an earlier export of this process must not be served from the cache
+    load_network.cache_clear()
+    exported = TrainedRainbowAgent(_rainbow_config(rainbow_type, backend), checkpoints_path)
+
+    observations = _parity_observations(eager, rainbow_type, parity_games)
+    for agent in (eager, exported):
+        agent.warm_up()
+
+    return RainbowExportReport(
+        rainbow_type=rainbow_type,
+        backend=backend,
+        exported_file=exported_file,
+        moves=len(observations),
+        matching_moves=sum(
+            eager_move == exported_move
+            for eager_move, exported_move in zip(eager.batch_act(observations), exported.batch_act(observations))
+        ),
+        eager_latency=_seconds_per_move(lambda batch: [eager.act(o) for o in batch], observations),
+        exported_latency=_seconds_per_move(lambda batch: [exported.act(o) for o in batch], observations),
+        eager_batched_latency=_seconds_per_move(eager.batch_act, observations),
+        exported_batched_latency=_seconds_per_move(exported.batch_act, observations),
+    )
+
+
+def export_rainbows(config: RainbowExportConfig) -> list[RainbowExportReport]:
+    checkpoints_path = config.checkpoints_path or DEFAULT_CHECKPOINTS_PATH
+
+    reports = []
+    for rainbow_type in config.rainbow_types:
+        if not network_path(checkpoints_path, rainbow_type).exists():
+            log.warning("Skipping %s, there is no checkpoint for it in %s", rainbow_type, checkpoints_path)
+            continue
+
+        reports.append(
+            export_rainbow(
+                rainbow_type,
+                config.backend,
+                checkpoints_path=checkpoints_path,
+                parity_games=config.parity_games,
+            ),
+        )
+
+    return reports
@@ -72,17 +72,21 @@ def _default_timing_distribution() -> float:
     return 1
 
 
-def configure_default_distribution(config: HanabiResearchConfig) -> None:
-    global _default_timing_distribution  # noqa: PLW0603
-
-    _default_timing_distribution = _normal_timing_distribution(
+def distribution_from_config(config: HanabiResearchConfig) -> DelayTimeFunction:
+    return _normal_timing_distribution(
         config.mean,
         config.standard_deviation,
         config.minimum_response_time,
     )
 
 
-def get_delay(agent: type[Agent] | Agent) -> float:
+def configure_default_distribution(config: HanabiResearchConfig) -> None:
+    global _default_timing_distribution  # noqa: PLW0603
+
+    _default_timing_distribution = distribution_from_config(config)
+
+
+def get_delay(agent: type[Agent] | Agent, default: DelayTimeFunction | None = None) -> float:
     t = agent if isinstance(agent, type) else type(agent)
 
-    return TIMING_MAP.get(t, _default_timing_distribution)()
+    return TIMING_MAP.get(t, default or _default_timing_distribution)()
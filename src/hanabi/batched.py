@@ -0,0 +1,218 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import random
+
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import count
+from logging import getLogger
+from typing import Any
+from typing import Iterator
+
+import numpy as np
+
+from hanabi_learning_environment.rl_env import Agent
+
+from hanabi.agents.inference import act_batched
+from hanabi.config.game import MAX_SEED
+from hanabi.config.game import HanabiGameConfig
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import Move
+from hanabi.moves import sanitize_move
+from hanabi.observations import AgentObservation
+from hanabi.simulation import GameResult
+
+
+log = getLogger(__name__)
+
+
+class BatchSizeMismatchError(Exception):
+    def __init__(self, moves: int, games: int) -> None:
+        super().__init__(f"Got {moves} moves for a batch of {games} games!")
+
+
+@dataclass()
+class BatchedObservation:
+    """Observations of the current players of all games of a batch, stacked once they are read."""
+
+    observations: list[AgentObservation]
+    # reward of the last move of every game, 0 for games which were just dealt
+    rewards: np.ndarray[Any, np.dtype[np.int8]]
+    # games which still need moves, the others are over and could not be reset
+    active: np.ndarray[Any, np.dtype[np.bool_]]
+    # games which ended with the last step, their slots already hold new games
+    finished: list[GameResult]
+    num_moves: int
+
+    @cached_property
+    def vectorized(self) -> np.ndarray[Any, np.dtype[np.uint8]]:
+        return np.asarray([observation["vectorized"] for observation in self.observations], dtype=np.uint8)
+
+    @cached_property
+    def legal_moves(self) -> np.ndarray[Any, np.dtype[np.bool_]]:
+        """Mask of the legal moves of every game over the move ids of `legal_moves_as_int`."""
+        mask = np.zeros((len(self.observations), self.num_moves), dtype=np.bool_)
+        for row, observation in enumerate(self.observations):
+            mask[row, observation["legal_moves_as_int"]] = True
+
+        return mask
+
+    @cached_property
+    def current_players(self) -> np.ndarray[Any, np.dtype[np.int8]]:
+        return np.asarray([observation["current_player"] for observation in self.observations], dtype=np.int8)
+
+
+class BatchedHanabiEnv:
+    """
+    Steps a batch of games in lockstep, e.g. to let learned agents choose the moves of all games at once.
+
+    A game that ends is replaced by a new one with the next seed. Once `seeds` are exhausted, ended games stay
+    in their slot and are no longer active. Without `seeds`, the games are dealt with consecutive seeds starting
+    at the config's seed, or at a random one.
+    """
+
+    def __init__(
+        self,
+        config: HanabiGameConfig,
+        player_list: list[type[Agent]],
+        batch_size: int,
+        *,
+        seeds: Iterator[int] | None = None,
+    ) -> None:
+        if seeds is None:
+            base_seed = config["seed"] if config["seed"] >= 0 else random.SystemRandom().randrange(MAX_SEED // 2)
+            seeds = count(base_seed)
+
+        self._config = config
+        self._player_list = player_list
+        self._seeds = seeds
+        self._games: list[SSEHanabiGame] = []
+        self._active = np.zeros(batch_size, dtype=np.bool_)
+        for slot in range(batch_size):
+            self._active[slot] = self._deal(slot)
+
+    @property
+    def games(self) -> list[SSEHanabiGame]:
+        return self._games
+
+    @property
+    def batch_size(self) -> int:
+        return len(self._games)
+
+    def _deal(self, slot: int) -> bool:
+        seed = next(self._seeds, None)
+        if seed is None:
+            return False
+
+        game = SSEHanabiGame({**self._config, "seed": seed}, self._player_list)
+        if slot < len(self._games):
+            self._games[slot] = game
+        else:
+            self._games.append(game)
+        return True
+
+    def _observe(self, rewards: np.ndarray[Any, np.dtype[np.int8]], finished: list[GameResult]) -> BatchedObservation:
+        return BatchedObservation(
+            observations=[game.get_agent_observation(game.current_player) for game in self._games],
+            rewards=rewards,
+            active=self._active.copy(),
+            finished=finished,
+            num_moves=self._games[0].num_moves,
+        )
+
+    def observe(self) -> BatchedObservation:
+        return self._observe(np.zeros(self.batch_size, dtype=np.int8), [])
+
+    def step(self, moves: list[Move | None]) -> BatchedObservation:
+        """Apply the move of the current player of every game, inactive games take None."""
+        if len(moves) != self.batch_size:
+            raise BatchSizeMismatchError(len(moves), self.batch_size)
+
+        rewards = np.zeros(self.batch_size, dtype=np.int8)
+        finished = []
+        for slot, (game, move) in enumerate(zip(self._games, moves)):
+            if not self._active[slot] or move is None:
+                continue
+
+            rewards[slot] = game.make_move(sanitize_move(move))
+            if game.is_terminal():
+                finished.append(
+                    GameResult(
+                        seed=game.config["seed"],
+                        score=int(game.score()),
+                        moves=game.version,
+                        end_status=game.game_end_status().name,
+                    ),
+                )
+                self._active[slot] = self._deal(slot)
+
+        return self._observe(rewards, finished)
+
+
+def play_batched(
+    config: HanabiGameConfig,
+    player_list: list[type[Agent]],
+    seeds: list[int],
+    *,
+    batch_size: int = 64,
+) -> list[GameResult]:
+    """Play the games of `seeds` in batches, the moves of learned agents are chosen for the whole batch at once."""
+    # rule based agents draw from the global generator, the results only depend on the seeds and the batch size
+    random.seed(seeds[0])
+
+    env = BatchedHanabiEnv(config, player_list, min(batch_size, len(seeds)), seeds=iter(seeds))
+    games = list(env.games)
+    agents = [[agent(game.config) for agent in player_list] for game in games]
+
+    results: list[GameResult] = []
+    batch = env.observe()
+    while batch.active.any():
+        active = np.flatnonzero(batch.active)
+        chosen = act_batched(
+            [agents[slot][batch.observations[slot]["current_player"]] for slot in active],
+            [batch.observations[slot] for slot in active],
+        )
+        moves: list[Move | None] = [None] * env.batch_size
+        for slot, move in zip(active, chosen):
+            moves[slot] = move
+
+        batch = env.step(moves)
+        results.extend(batch.finished)
+        # new games need new agents, e.g. rule based ones track what they have seen of their game
+        for slot, game in enumerate(env.games):
+            if game is not games[slot]:
+                games[slot] = game
+                agents[slot] = [agent(game.config) for agent in player_list]
+
+    return sorted(results, key=lambda result: result.seed)
@@ -32,20 +32,30 @@
 from __future__ import annotations
 
 import logging
+import shlex
 
+from argparse import SUPPRESS
 from argparse import ArgumentDefaultsHelpFormatter
 from argparse import ArgumentParser
+from argparse import ArgumentTypeError
 from argparse import Namespace
 from functools import partial
 from pathlib import Path
+from typing import Any
 from typing import NamedTuple
 
 from hanabi.agents import AGENT_MAP, RAINBOW_TYPES
+from hanabi.agents import RAINBOW_BACKENDS
 from hanabi.agents import get_players
+from hanabi.config.export import RainbowExportConfig
 from hanabi.config.game import HanabiGameConfig
+from hanabi.config.loadtest import HanabiLoadTestConfig
 from hanabi.config.research import HanabiResearchConfig
 from hanabi.config.server import HanabiServerConfig
-from hanabi.server import HanabiServer
+from hanabi.config.simulation import HanabiSimulationConfig
+from hanabi.config.tournament import HanabiTournamentConfig
+from hanabi.simulation import simulate
+from hanabi.tournament import tournament
 
 
 class RecordFileAlreadyExistsError(Exception):
@@ -54,10 +64,35 @@ class RecordFileAlreadyExistsError(Exception):
         super().__init__(f"Record file at {path!s} already exists!")
 
 
+def _positive_int(value: str) -> int:
+    msg = f"has to be a positive integer, not {value!r}"
+    try:
+        number = int(value)
+    except ValueError as e:
+        raise ArgumentTypeError(msg) from e
+    if number < 1:
+        raise ArgumentTypeError(msg)
+    return number
+
+
+# defaults of the game options which differ for a command
+_COMMAND_DEFAULTS: dict[str, dict[str, Any]] = {
+    "simulate": {"player_list": ["piers", "piers"]},
+    # resuming needs the same seeds
+    "tournament": {"seed": 0},
+    # not the port of a server which may already be running
+    "load-test": {"port": 8765},
+}
+
+
 class Arguments(NamedTuple):
     game_options: HanabiGameConfig
     server_options: HanabiServerConfig
     research_options: HanabiResearchConfig
+    simulation_options: HanabiSimulationConfig | None = None
+    export_options: RainbowExportConfig | None = None
+    tournament_options: HanabiTournamentConfig | None = None
+    load_test_options: HanabiLoadTestConfig | None = None
 
     @classmethod
     def from_parser(cls, args: Namespace) -> Arguments:
@@ -72,10 +107,18 @@ class Arguments(NamedTuple):
                 "seed": args.seed,
                 "random_start_player": not args.no_random_start_player,
                 "rainbow_type": args.rainbow_type,
+                "rainbow_backend": args.rainbow_backend,
             },
             server_options=HanabiServerConfig(
                 args.host,
                 args.port,
+                delta_game_state=args.delta_game_state,
+                keyframe_interval=args.keyframe_interval,
+                warm_up_agents=not args.no_warm_up,
+                agent_workers=args.agent_workers,
+                speculative_replies=args.speculative_replies,
+                snapshot_directory=None if args.snapshot_directory is None else Path(args.snapshot_directory),
+                room_idle_timeout=args.room_idle_timeout,
             ),
             research_options=HanabiResearchConfig(
                 record_file=Path(args.record_file),
@@ -87,56 +130,129 @@ class Arguments(NamedTuple):
                 only_show_last_n_discards=args.only_show_last_n_discards,
                 only_show_last_n_events=args.only_show_last_n_events,
                 disable_discard_pile=args.disable_discard_pile,
+                record_fsync_interval=args.record_fsync_interval,
+                record_max_bytes=args.record_max_bytes,
+                binary_record=args.binary_record,
+            ),
+            simulation_options=(
+                HanabiSimulationConfig(
+                    games=args.games,
+                    workers=args.workers,
+                    batch_size=args.batch_size,
+                )
+                if args.command == "simulate"
+                else None
+            ),
+            export_options=(
+                RainbowExportConfig(
+                    rainbow_types=args.rainbow_types,
+                    backend=args.backend,
+                    checkpoints_path=args.checkpoints_path,
+                    parity_games=args.parity_games,
+                )
+                if args.command == "export-rainbow"
+                else None
+            ),
+            tournament_options=(
+                HanabiTournamentConfig(
+                    results_file=Path(args.results_file),
+                    participants=args.participants,
+                    games=args.games,
+                    workers=args.workers,
+                    chunk_size=args.chunk_size,
+                    matrix_file=None if args.matrix_file is None else Path(args.matrix_file),
+                )
+                if args.command == "tournament"
+                else None
+            ),
+            load_test_options=(
+                HanabiLoadTestConfig(
+                    player_list=args.player_list,
+                    concurrency=args.concurrency,
+                    duration=args.duration,
+                    think_time=args.think_time,
+                    port=args.port,
+                    server_arguments=args.server_arguments,
+                    report_file=None if args.report_file is None else Path(args.report_file),
+                )
+                if args.command == "load-test"
+                else None
             ),
         )
 
 
-def _parse() -> Arguments:
-    parser = ArgumentParser(
-        description="Test system for Hanabi study.",
-        formatter_class=ArgumentDefaultsHelpFormatter,
-    )
+def _add_game_arguments(parser: ArgumentParser, *, inherited: bool = False) -> None:
+    def default(value: Any) -> Any:  # noqa: ANN401
+        # the copies of a command have no defaults, which would overwrite the options given before the command
+        return SUPPRESS if inherited else value
 
     research_options_parser = parser.add_argument_group("RESEARCH OPTIONS")
     research_options_parser.add_argument(
         "--record-file",
         type=str,
-        default="records.csv",
+        default=default("records.csv"),
         help="Where the recording in csv-format should be exported to",
     )
+    research_options_parser.add_argument(
+        "--record-fsync-interval",
+        metavar="SECONDS",
+        type=float,
+        default=default(1.0),
+        help="Records are written as they happen and synced to disk at most this many seconds apart",
+    )
+    research_options_parser.add_argument(
+        "--record-max-bytes",
+        metavar="BYTES",
+        type=int,
+        default=default(None),
+        help="Continue the recording in a new numbered file once the current one grew beyond this size",
+    )
+    research_options_parser.add_argument(
+        "--binary-record",
+        action="store_true",
+        default=SUPPRESS if inherited else False,
+        help="Additionally record into a compact binary file next to the record file, see hanabi.recording",
+    )
     research_options_parser.add_argument(
         "--player-list",
         type=partial(str.split, sep=","),
-        default=["human", "random"],
+        default=default(["human", "random"]),
         help=f"Comma separated list of agents, possible agents: {', '.join(AGENT_MAP.keys())}",
     )
     research_options_parser.add_argument(
         "--rainbow-type",
         type=str,
-        default="paired_piers",
+        default=default("paired_piers"),
         help=f"Type of trained Rainbow agent to use if Rainbow agent is in player list: {', '.join(RAINBOW_TYPES)} ",
     )
+    research_options_parser.add_argument(
+        "--rainbow-backend",
+        choices=RAINBOW_BACKENDS,
+        default=default("eager"),
+        help="How Rainbow agents run their network, the traced ones have to be exported with export-rainbow first",
+    )
     research_options_parser.add_argument(
         "--mean",
         type=float,
-        default=2.0,
-        help="Mean of the timing distribution for non-human agents",
+        default=default(2.0),
+        help="Mean of the timing distribution for non-human agents, their time to choose a move is included",
     )
     research_options_parser.add_argument(
         "--standard-deviation",
         type=float,
-        default=1,
+        default=default(1),
         help="standard-deviation for the timing distribution for non-human agents",
     )
     research_options_parser.add_argument(
         "--minimum-response-time",
         type=float,
-        default=1,
+        default=default(1),
         help="Minimum response time for non-human agents",
     )
     research_options_parser.add_argument(
         "--only-show-diff-knowledge",
         action="store_true",
+        default=SUPPRESS if inherited else False,
         dest="show_diff_knowledge",
         help="Only show what you learned from the last hint",
     )
@@ -144,19 +260,20 @@ def _parse() -> Arguments:
         "--only-show-last-n-discards",
         metavar="N",
         type=int,
-        default=-1,
+        default=default(-1),
         help="Only show the last N discards or -1 for everything",
     )
     research_options_parser.add_argument(
         "--only-show-last-n-events",
         metavar="N",
         type=int,
-        default=-1,
+        default=default(-1),
         help="Only show the last N events or -1 for everything",
     )
     research_options_parser.add_argument(
         "--disable-discard-pile",
         action="store_true",
+        default=SUPPRESS if inherited else False,
         help="Disable discard pile entirely, trumps --only-show-last-n-discards",
     )
 
@@ -164,45 +281,48 @@ def _parse() -> Arguments:
     game_options_parser.add_argument(
         "--colors",
         type=int,
-        default=5,
+        default=default(5),
         help="Color count, maximum 5",
     )
     game_options_parser.add_argument(
         "--ranks",
         type=int,
-        default=5,
+        default=default(5),
         help="Card ranks, maximum 5",
     )
     game_options_parser.add_argument(
         "--hand-size",
         type=int,
-        default=5,
+        default=default(5),
         help="Hand size",
     )
     game_options_parser.add_argument(
         "--max-information-tokens",
         type=int,
-        default=8,
+        default=default(8),
         help="Max information tokens",
     )
     game_options_parser.add_argument(
         "--max-life-tokens",
         type=int,
-        default=3,
+        default=default(3),
         help="Max life tokens",
     )
     game_options_parser.add_argument(
         "--seed",
         type=int,
-        default=-1,
+        default=default(-1),
         help="Random seed for card/game generation",
     )
     game_options_parser.add_argument(
         "--no-random-start-player",
         action="store_true",
+        default=SUPPRESS if inherited else False,
         help="start player chosen at random",
     )
 
+
+def _add_server_arguments(parser: ArgumentParser) -> None:
     server_options_parser = parser.add_argument_group("SERVER OPTIONS")
     server_options_parser.add_argument(
         "--host",
@@ -216,8 +336,240 @@ def _parse() -> Arguments:
         default="8000",
         help="Where the game server should be available",
     )
+    server_options_parser.add_argument(
+        "--delta-game-state",
+        action="store_true",
+        help="Only send what changed since the last game state to the clients",
+    )
+    server_options_parser.add_argument(
+        "--keyframe-interval",
+        metavar="N",
+        type=int,
+        default=20,
+        help="With --delta-game-state, send a full game state every N moves or never for 0",
+    )
+    server_options_parser.add_argument(
+        "--no-warm-up",
+        action="store_true",
+        help="Do not run the networks of the agents once at start, their first move is slower then",
+    )
+    server_options_parser.add_argument(
+        "--agent-workers",
+        metavar="N",
+        type=int,
+        default=4,
+        help="Threads choosing the moves of agents, so slow agents do not block the clients of other rooms",
+    )
+    server_options_parser.add_argument(
+        "--speculative-replies",
+        metavar="N",
+        type=int,
+        default=0,
+        help="While a human thinks, let the next agent choose its replies to up to N possible hints or to all for -1",
+    )
+    server_options_parser.add_argument(
+        "--snapshot-directory",
+        metavar="DIR",
+        type=str,
+        default=None,
+        help="Keep a snapshot of every open game in DIR and continue the games found there after a restart",
+    )
+    server_options_parser.add_argument(
+        "--room-idle-timeout",
+        metavar="SECONDS",
+        type=float,
+        default=600.0,
+        help="Record and close rooms nobody was connected to for this long, even during their game",
+    )
+
+
+def _add_simulation_arguments(parser: ArgumentParser) -> None:
+    simulation_options_parser = parser.add_argument_group("SIMULATION OPTIONS")
+    simulation_options_parser.add_argument(
+        "--games",
+        type=_positive_int,
+        default=1000,
+        help="Number of games to simulate, game i is played with seed + i",
+    )
+    simulation_options_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes, defaults to one per core",
+    )
+    simulation_options_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Games every worker plays in lockstep, Rainbow agents choose the moves of all of them at once",
+    )
+
+
+def _add_tournament_arguments(parser: ArgumentParser) -> None:
+    tournament_options_parser = parser.add_argument_group("TOURNAMENT OPTIONS")
+    tournament_options_parser.add_argument(
+        "--results-file",
+        type=str,
+        default="tournament.jsonl",
+        help="Where the results are written to, an existing file is continued without replaying its games",
+    )
+    tournament_options_parser.add_argument(
+        "--participants",
+        type=partial(str.split, sep=","),
+        default=None,
+        help="Comma separated list of agents or rainbow:<rainbow type>, defaults to all but humans",
+    )
+    tournament_options_parser.add_argument(
+        "--games",
+        type=_positive_int,
+        default=1000,
+        help="Number of games of every pairing, game i is played with seed + i",
+    )
+    tournament_options_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes, defaults to one per core",
+    )
+    tournament_options_parser.add_argument(
+        "--chunk-size",
+        metavar="N",
+        type=int,
+        default=50,
+        help="Games of a pairing which are played and written together",
+    )
+    tournament_options_parser.add_argument(
+        "--matrix-file",
+        type=str,
+        default=None,
+        help="Write the mean scores with their 95%% confidence intervals as a csv matrix",
+    )
+
+
+def _add_export_arguments(parser: ArgumentParser) -> None:
+    export_options_parser = parser.add_argument_group("EXPORT OPTIONS")
+    export_options_parser.add_argument(
+        "--rainbow-types",
+        type=partial(str.split, sep=","),
+        default=RAINBOW_TYPES,
+        help="Comma separated list of Rainbow agents to export, those without checkpoint are skipped",
+    )
+    export_options_parser.add_argument(
+        "--backend",
+        choices=[backend for backend in RAINBOW_BACKENDS if backend != "eager"],
+        default="torchscript",
+        help="Export a traced network or one with int8 quantized linear layers",
+    )
+    export_options_parser.add_argument(
+        "--checkpoints-path",
+        type=Path,
+        default=None,
+        help="Directory with the checkpoints, defaults to the ones shipped with the Rainbow agent",
+    )
+    export_options_parser.add_argument(
+        "--parity-games",
+        metavar="N",
+        type=int,
+        default=10,
+        help="Compare the moves and speed of the exported and the eager network on N self-play games",
+    )
+
+
+def _add_load_test_arguments(parser: ArgumentParser) -> None:
+    load_test_options_parser = parser.add_argument_group("LOAD TEST OPTIONS")
+    load_test_options_parser.add_argument(
+        "--player-list",
+        type=partial(str.split, sep=","),
+        default=["human", "piers"],
+        help="Players of every room, the human seats are taken by simulated humans",
+    )
+    load_test_options_parser.add_argument(
+        "--concurrency",
+        type=lambda levels: [int(level) for level in levels.split(",")],
+        default=[1, 4, 16, 64],
+        help="Comma separated numbers of rooms played at the same time, every one is measured on its own",
+    )
+    load_test_options_parser.add_argument(
+        "--duration",
+        type=float,
+        default=20.0,
+        help="Seconds every number of rooms is measured",
+    )
+    load_test_options_parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0.5,
+        help="Mean seconds a simulated human thinks before a move",
+    )
+    load_test_options_parser.add_argument(
+        "--port",
+        type=int,
+        # like the --port of the server, so it may also be given before the command
+        default=SUPPRESS,
+        help="Port of the local server under test, defaults to 8765",
+    )
+    load_test_options_parser.add_argument(
+        "--server-arguments",
+        type=shlex.split,
+        default=[],
+        help='Further arguments of the server, e.g. --server-arguments="--delta-game-state --mean 1"',
+    )
+    load_test_options_parser.add_argument(
+        "--report-file",
+        type=str,
+        default=None,
+        help="Write the measurements of every number of rooms as json",
+    )
+
+
+def _parse() -> Arguments:
+    parser = ArgumentParser(
+        description="Test system for Hanabi study.",
+        formatter_class=ArgumentDefaultsHelpFormatter,
+    )
+    _add_game_arguments(parser)
+    _add_server_arguments(parser)
+
+    subparsers = parser.add_subparsers(dest="command", title="COMMANDS")
+    simulate_parser = subparsers.add_parser(
+        "simulate",
+        description="Play agent-only games headless and without delay across all cores.",
+        help="Play agent-only games headless and report the score distribution",
+        formatter_class=ArgumentDefaultsHelpFormatter,
+    )
+    _add_game_arguments(simulate_parser, inherited=True)
+    _add_simulation_arguments(simulate_parser)
+
+    tournament_parser = subparsers.add_parser(
+        "tournament",
+        description="Play every pairing of agents on the same seeds, continuing the games of earlier runs.",
+        help="Play a round robin tournament and report the score matrix",
+        formatter_class=ArgumentDefaultsHelpFormatter,
+    )
+    _add_game_arguments(tournament_parser, inherited=True)
+    _add_tournament_arguments(tournament_parser)
+
+    export_parser = subparsers.add_parser(
+        "export-rainbow",
+        description="Export Rainbow checkpoints to traced networks, which run faster without python.",
+        help="Export Rainbow checkpoints for the torchscript and quantized backends",
+        formatter_class=ArgumentDefaultsHelpFormatter,
+    )
+    _add_export_arguments(export_parser)
+
+    load_test_parser = subparsers.add_parser(
+        "load-test",
+        description="Start a local server and let more and more simulated humans play on it at the same time.",
+        help="Measure move latency, throughput and resources of a server under load",
+        formatter_class=ArgumentDefaultsHelpFormatter,
+    )
+    _add_load_test_arguments(load_test_parser)
 
     args = parser.parse_args()
+    if (command_defaults := _COMMAND_DEFAULTS.get(args.command)) is not None:
+        # for the options given neither before nor after the command
+        parser.set_defaults(**command_defaults)
+        args = parser.parse_args()
 
     return Arguments.from_parser(args)
 
@@ -229,9 +581,41 @@ def main() -> None:
 
     arguments = _parse()
 
-    if arguments.research_options.record_file.exists():
+    if arguments.simulation_options is not None:
+        simulate(
+            arguments.game_options,
+            arguments.research_options.player_list,
+            arguments.simulation_options,
+        ).log_summary()
+        return
+
+    if arguments.tournament_options is not None:
+        tournament(arguments.game_options, arguments.tournament_options).log_summary()
+        return
+
+    if arguments.export_options is not None:
+        # torch is only needed for the export
+        from hanabi.agents.rainbow_export import export_rainbows
+
+        for report in export_rainbows(arguments.export_options):
+            report.log_summary()
+        return
+
+    if arguments.load_test_options is not None:
+        # the socket.io client is only needed for the load test
+        from hanabi.loadtest import load_test
+
+        load_test(arguments.load_test_options)
+        return
+
+    # a restarted server continues its games in new record files next to the existing ones
+    restarting = arguments.server_options.snapshot_directory is not None
+    if arguments.research_options.record_file.exists() and not restarting:
         raise RecordFileAlreadyExistsError(arguments.research_options.record_file)
 
+    # flask and socketio are only needed for the server and slow down everything else
+    from hanabi.server import HanabiServer
+
     log.debug("Starting server...")
     HanabiServer(
         arguments.server_options,
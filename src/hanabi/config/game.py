@@ -40,9 +40,15 @@
 # "observation_type": int AgentObservationType.
 from __future__ import annotations
 
+import random
+
+from typing import Final
 from typing import TypedDict
 
 
+MAX_SEED: Final[int] = 2**31 - 1
+
+
 class HanabiGameConfig(TypedDict):
     players: int
     colors: int
@@ -53,6 +59,7 @@ class HanabiGameConfig(TypedDict):
     seed: int
     random_start_player: bool
     rainbow_type: str
+    rainbow_backend: str
 
 
 def default_game_config(players: int = 2) -> HanabiGameConfig:
@@ -66,4 +73,13 @@ def default_game_config(players: int = 2) -> HanabiGameConfig:
         "seed": -1,
         "random_start_player": False,
         "rainbow_type": "paired_piers",  # configuration is only needed for rainbow agents and otherwise ignored
+        "rainbow_backend": "eager",
     }
+
+
+def with_concrete_seed(config: HanabiGameConfig) -> HanabiGameConfig:
+    """Draw a seed for configs asking for a random one, so the game can be replayed from its seed and moves."""
+    if config["seed"] >= 0:
+        return config
+
+    return {**config, "seed": random.SystemRandom().randrange(MAX_SEED)}
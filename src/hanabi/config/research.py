@@ -53,3 +53,10 @@ class HanabiResearchConfig:
     only_show_last_n_events: int
 
     disable_discard_pile: bool
+
+    # records are streamed into the record file, synced to disk at most this many seconds apart
+    record_fsync_interval: float = 1.0
+    # start a new numbered record file once the current one grew beyond this size
+    record_max_bytes: int | None = None
+    # additionally record into a compact binary file next to the record file
+    binary_record: bool = False
@@ -32,9 +32,23 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from pathlib import Path
 
 
 @dataclass()
 class HanabiServerConfig:
     host: str = "0.0.0.0"  # noqa: S104
     port: int = 8000
+    # send only the changes of an observation and a full one every `keyframe_interval` moves
+    delta_game_state: bool = False
+    keyframe_interval: int = 20
+    # let the agents of the default room prepare their first move before clients connect
+    warm_up_agents: bool = True
+    # threads choosing the moves of agents without a batched network, the event loop keeps serving meanwhile
+    agent_workers: int = 4
+    # while a human thinks, let the next agent choose its replies to up to this many hints, -1 for all and 0 for none
+    speculative_replies: int = 0
+    # keep a snapshot of every open room in this directory and restore the rooms found there at start
+    snapshot_directory: Path | None = None
+    # seconds after which a room nobody is connected to is recorded and closed, even during its game
+    room_idle_timeout: float = 600.0
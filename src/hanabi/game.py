@@ -31,26 +31,35 @@
 #
 from __future__ import annotations
 
+from collections import deque
+from functools import partial
 from logging import getLogger
-from typing import Any
+from typing import Callable
+from typing import NamedTuple
 import copy
 
 import numpy as np
 
 from hanabi_learning_environment.pyhanabi import HanabiEndOfGameType
 from hanabi_learning_environment.pyhanabi import HanabiGame
+from hanabi_learning_environment.pyhanabi import HanabiMoveType
+from hanabi_learning_environment.pyhanabi import HanabiObservation
 from hanabi_learning_environment.pyhanabi import HanabiState
 from hanabi_learning_environment import pyhanabi
 from hanabi_learning_environment.rl_env import Agent
 from hanabi_learning_environment.rl_env import HanabiEnv
 
 from hanabi.config.game import HanabiGameConfig
+from hanabi.config.game import with_concrete_seed
 from hanabi.moves import Move
 from hanabi.moves import is_discard_or_play
+from hanabi.moves import to_hanabi_move
 from hanabi.observations import AgentObservation
 from hanabi.observations import Event
 from hanabi.observations import FullObservation
+from hanabi.observations import LazyAgentObservation
 from hanabi.observations import PlayerSpecificObservation
+from hanabi.observations import VectorizedEncoding
 from hanabi.observations import from_hanabi_observation
 from hanabi.recording import HanabiRecorder
 
@@ -58,15 +67,52 @@ from hanabi.recording import HanabiRecorder
 log = getLogger(__name__)
 
 
+class IllegalMoveError(Exception):
+    def __init__(self, move: Move) -> None:
+        super().__init__(f"Move {move!r} is not legal in the current state")
+
+
+class HypotheticalHint(NamedTuple):
+    """A hint the current player could give, see `SSEHanabiGame.hypothetical_hints`."""
+
+    move_uid: int
+    # observation of the next player after the hint
+    observe: Callable[[], AgentObservation]
+
+
 # TODO(ms): rename this to something sensible
 class SSEHanabiGame:
-    def __init__(self, config: HanabiGameConfig, player_list: list[type[Agent]]) -> None:
-        self._config = config
+    def __init__(
+        self,
+        config: HanabiGameConfig,
+        player_list: list[type[Agent]],
+        *,
+        event_window: int = -1,
+        recorder: HanabiRecorder | None = None,
+    ) -> None:
+        self._config = with_concrete_seed(config)
+
+        # append-only, the observations of a version share one snapshot of it instead of rebuilding it for every one
+        self._event_log: list[Event] = []
+        self._event_log_snapshot: list[Event] | None = None
+        # ring buffer of the last `event_window` events for clients which only get to see those
+        self._recent_events: deque[Event] | None = deque(maxlen=event_window) if event_window > -1 else None
 
         self._player_list = [p.__name__ for p in player_list]
-        self.recorder = HanabiRecorder()
+        self.recorder = HanabiRecorder() if recorder is None else recorder
+        # only used for its game and encoder, stepping the env would encode every observation right away
         self._env = HanabiEnv(self._config)
-        initial_observation: FullObservation = self._env.reset()
+        self._hanabi_state: HanabiState = self._game.new_initial_state()
+        self._deal_cards()
+
+        # bumped by every move, observations are only built once per (version, player)
+        self._version = 0
+        self._observations: dict[
+            tuple[int, int],
+            tuple[HanabiObservation, PlayerSpecificObservation, VectorizedEncoding],
+        ] = {}
+
+        initial_observation = self._full_observation()
 
         self.recorder.add_record(
             player=HanabiRecorder.NO_PLAYER_MOVED,
@@ -78,6 +124,20 @@ class SSEHanabiGame:
 
         self._current_observation: FullObservation = initial_observation
 
+    @property
+    def config(self) -> HanabiGameConfig:
+        """The game's config, always with the concrete seed the game was dealt with."""
+        return self._config
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def num_moves(self) -> int:
+        """Number of distinct moves, i.e. the length of a mask over `legal_moves_as_int`."""
+        return self._game.max_moves()  # type: ignore[no-any-return]
+
     @property
     def max_score(self) -> int:
         return self._config["ranks"] * self._config["colors"]
@@ -88,15 +148,27 @@ class SSEHanabiGame:
 
     @property
     def _state(self) -> HanabiState:
-        return self._env.state
+        return self._hanabi_state
 
     @property
-    def _event_log(self) -> list[Event]:
-        return [
-            Event(move=e.move, player_index=e.player)
-            for e in self.recorder.records
-            if e.move is not None
-        ]
+    def event_log(self) -> list[Event]:
+        """All events so far, the list is shared and must not be modified."""
+        return self._event_log
+
+    @property
+    def windowed_event_log(self) -> list[Event]:
+        """The last `event_window` events or all of them if the game has no window."""
+        if self._recent_events is None:
+            return self._versioned_event_log()
+
+        return list(self._recent_events)
+
+    def _versioned_event_log(self) -> list[Event]:
+        """Snapshot of the event log taken once per version, so it does not grow with the following moves."""
+        if self._event_log_snapshot is None:
+            self._event_log_snapshot = self._event_log[:]
+
+        return self._event_log_snapshot
 
     @property
     def current_player(self) -> int:
@@ -106,9 +178,27 @@ class SSEHanabiGame:
     def current_full_observation(self) -> FullObservation:
         return self._current_observation
 
-    def make_move(self, move: Move) -> None:
+    def _deal_cards(self) -> None:
+        while self._state.cur_player() == pyhanabi.CHANCE_PLAYER_ID:
+            self._state.deal_random_card()
+
+    def _full_observation(self) -> FullObservation:
+        return {
+            "current_player": self.current_player,
+            "player_observations": [self.get_agent_observation(player) for player in range(len(self._player_list))],
+        }
+
+    def make_move(self, move: Move) -> int:
+        """Apply the move of the current player and return its reward."""
         player = self.current_player
 
+        try:
+            hanabi_move = to_hanabi_move(move)
+        except (AssertionError, KeyError, TypeError, ValueError) as e:
+            raise IllegalMoveError(move) from e
+        if not self._state.move_is_legal(hanabi_move):
+            raise IllegalMoveError(move)
+
         if (special_move := is_discard_or_play(move)) is not None:
             other_player_index = (self.current_player + 1) % len(self._player_list)
 
@@ -119,12 +209,21 @@ class SSEHanabiGame:
             ]
             special_move["played_card"] = target_card
 
-        # observation: FullObservation
-        # reward: float, Reward obtained from taking the action.
-        # done: bool, Whether the game is done.
-        # info: dict, Optional debugging information.
-        result: tuple[FullObservation, float, bool, dict[str, Any]] = self._env.step(move)
-        observation, reward, _done, _info = result
+        score_before = self._state.score()
+        self._state.apply_move(hanabi_move)
+        self._deal_cards()
+        self._version += 1
+        self._observations.clear()
+        self._event_log_snapshot = None
+
+        event = Event(move=move, player_index=player)
+        self._event_log.append(event)
+        if self._recent_events is not None:
+            self._recent_events.append(event)
+
+        # reward is the score difference, which may be large and negative at the end of the game
+        reward: int = self._state.score() - score_before
+        observation = self._full_observation()
 
         self.recorder.add_record(
             player=player,
@@ -134,25 +233,87 @@ class SSEHanabiGame:
             reward=reward,
         )
         self._current_observation = observation
+        return reward
 
-    def get_observation(self, player: int) -> PlayerSpecificObservation:
-        return from_hanabi_observation(
-            self.current_player,
-            self._state.fireworks(),
-            self._state.observation(player),
-            self._env,
-            self._event_log,
+    def move_uid(self, move: Move) -> int | None:
+        """Index of the move among all moves of the game or None if it is not a valid move."""
+        try:
+            return self._game.get_move_uid(to_hanabi_move(move))  # type: ignore[no-any-return]
+        except (AssertionError, KeyError, TypeError, ValueError):
+            return None
+
+    def move_of_uid(self, move_uid: int) -> Move:
+        return self._game.get_move(move_uid).to_dict()  # type: ignore[no-any-return]
+
+    def hypothetical_hints(self, limit: int = -1) -> list[HypotheticalHint]:
+        """
+        Up to `limit` legal hints of the current player, with what the next player would observe after them.
+
+        Only hints are considered, playing or discarding would deal a card from the random numbers of the game.
+        The states are copied right away, the observations are only built when called, e.g. in another thread.
+        """
+        next_player = (self.current_player + 1) % len(self._player_list)
+        hints: list[HypotheticalHint] = []
+        for hanabi_move in self._state.legal_moves():
+            if len(hints) == limit:
+                break
+            if hanabi_move.type() not in (HanabiMoveType.REVEAL_COLOR, HanabiMoveType.REVEAL_RANK):
+                continue
+
+            state = self._state.copy()
+            state.apply_move(hanabi_move)
+            event_log = [*self._event_log, Event(move=hanabi_move.to_dict(), player_index=self.current_player)]
+            hints.append(
+                HypotheticalHint(
+                    self._game.get_move_uid(hanabi_move),
+                    partial(self._hypothetical_observation, state, next_player, event_log),
+                ),
+            )
+
+        return hints
+
+    def _hypothetical_observation(self, state: HanabiState, player: int, event_log: list[Event]) -> AgentObservation:
+        observation = state.observation(player)
+        return LazyAgentObservation(  # type: ignore[return-value]
+            {
+                **from_hanabi_observation(player, state.fireworks(), observation, self._env, event_log),
+                "pyhanabi": observation,
+            },
+            VectorizedEncoding(self._env, observation),
         )
 
+    def _cached_observation(
+        self,
+        player: int,
+    ) -> tuple[HanabiObservation, PlayerSpecificObservation, VectorizedEncoding]:
+        key = (self._version, player)
+        if (cached := self._observations.get(key)) is None:
+            observation = self._state.observation(player)
+            cached = self._observations[key] = (
+                observation,
+                from_hanabi_observation(
+                    self.current_player,
+                    self._state.fireworks(),
+                    observation,
+                    self._env,
+                    self._versioned_event_log(),
+                ),
+                VectorizedEncoding(self._env, observation),
+            )
+
+        return cached
+
+    def get_observation(self, player: int) -> PlayerSpecificObservation:
+        """Observation of the current version, it is shared and must be copied before being modified."""
+        return self._cached_observation(player)[1]
+
     def get_agent_observation(self, player: int) -> AgentObservation:
-        player_specific = from_hanabi_observation(
-            self.current_player,
-            self._state.fireworks(),
-            (observation := self._state.observation(player)),
-            self._env,
-            self._event_log,
+        """Observation of the current version for agents, "vectorized" is only encoded once an agent reads it."""
+        observation, player_specific, encoding = self._cached_observation(player)
+        return LazyAgentObservation(  # type: ignore[return-value]
+            {**player_specific, "pyhanabi": observation},
+            encoding,
         )
-        return {**player_specific, "pyhanabi": observation}  # type: ignore[misc]
 
     def is_terminal(self) -> bool:
         return self._state.is_terminal()  # type: ignore[no-any-return]
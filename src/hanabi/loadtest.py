@@ -0,0 +1,360 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+
+from contextlib import contextmanager
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from importlib.util import find_spec
+from logging import getLogger
+from pathlib import Path
+from queue import Empty
+from queue import Queue
+from random import Random
+from threading import Event
+from threading import Thread
+from time import perf_counter
+from time import sleep
+from typing import Any
+from typing import Iterator
+from urllib.error import URLError
+from urllib.request import urlopen
+
+import socketio
+
+from hanabi.config.loadtest import HanabiLoadTestConfig
+
+
+log = getLogger(__name__)
+
+# seconds until a server which does not answer is given up on
+_SERVER_START_TIMEOUT = 60.0
+# seconds a simulated human waits for a message before checking whether to stop
+_MESSAGE_TIMEOUT = 0.1
+# last bytes of the log of a server which did not start
+_SERVER_LOG_TAIL = 2000
+
+
+class ServerStartError(Exception):
+    def __init__(self, server_log: str) -> None:
+        super().__init__(f"The server did not start:\n{server_log}")
+
+
+class NoHumanSeatError(Exception):
+    def __init__(self, player_list: list[str]) -> None:
+        super().__init__(f"The player list {player_list} has no human seat to simulate!")
+
+
+class MissingWebsocketClientError(Exception):
+    def __init__(self) -> None:
+        super().__init__("The simulated humans need the websocket-client package: pip install websocket-client")
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest rank percentile, NaN without values."""
+    if not values:
+        return math.nan
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def _cpu_seconds(pid: int) -> float | None:
+    """User and system time of a process so far, None where /proc is not available."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return None
+
+    # the fields after the executable name, which may contain spaces, start with the state
+    fields = stat.rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _rss_bytes(pid: int) -> int | None:
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+
+    for line in status.splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) * 1024
+
+    return None
+
+
+@dataclass()
+class LoadLevelReport:
+    concurrency: int
+    # seconds the level was measured
+    duration: float
+    moves: int
+    games: int
+    errors: int
+    # seconds from sending a move until the game state with it arrived
+    latency_p50: float
+    latency_p99: float
+    # cores used by the server on average and its memory at the end, None where unknown
+    server_cpu: float | None
+    server_rss: int | None
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.duration
+
+    def log_summary(self) -> None:
+        log.info(
+            "%d rooms: %.1f moves/s, %d games, latency p50 %.1fms | p99 %.1fms, server %s cores | %s MB, %d errors",
+            self.concurrency,
+            self.moves_per_second,
+            self.games,
+            1000 * self.latency_p50,
+            1000 * self.latency_p99,
+            "?" if self.server_cpu is None else f"{self.server_cpu:.2f}",
+            "?" if self.server_rss is None else f"{self.server_rss / 2**20:.0f}",
+            self.errors,
+        )
+
+
+@dataclass()
+class _HumanStats:
+    moves: int = 0
+    games: int = 0
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+
+class SimulatedHuman(Thread):
+    """
+    Plays a human seat of one room after the other through socket.io, as a browser would.
+
+    Moves are chosen at random from the legal moves of the received observation after an
+    exponentially distributed think time. Both full game states and patches are understood.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        url: str,
+        room_prefix: str,
+        seat: int,
+        think_time: float,
+        stop: Event,
+        *,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__(name=f"simulated-human-{room_prefix}-{seat}", daemon=True)
+        self.stats = _HumanStats()
+        self._url = url
+        self._room_prefix = room_prefix
+        self._seat = seat
+        self._think_time = think_time
+        self._stop_requested = stop
+        self._rng = Random(seed)
+
+    def run(self) -> None:
+        while not self._stop_requested.is_set():
+            room = f"{self._room_prefix}-{self.stats.games + self.stats.errors}"
+            try:
+                self._play(room)
+            except socketio.exceptions.SocketIOError:  # noqa: PERF203
+                log.exception("Simulated human of room %s failed", room)
+                self.stats.errors += 1
+                self._stop_requested.wait(1)
+
+    def _think(self) -> None:
+        self._stop_requested.wait(self._rng.expovariate(1 / self._think_time) if self._think_time > 0 else 0)
+
+    def _play(self, room: str) -> None:
+        client = socketio.Client()
+        messages: Queue[dict[str, Any]] = Queue()
+        ended = Event()
+        client.on("game_state", messages.put)
+        client.on("game_state_patch", messages.put)
+        client.on("game_ended", lambda _: ended.set())
+        client.connect(self._url, auth={"room": room, "player_id": self._seat}, transports=["websocket"])
+
+        observation: dict[str, Any] = {}
+        version = -1
+        # time and version of the move in flight
+        sent: tuple[float, int] | None = None
+        try:
+            while not ended.is_set() and not self._stop_requested.is_set():
+                try:
+                    message = messages.get(timeout=_MESSAGE_TIMEOUT)
+                except Empty:  # noqa: PERF203
+                    continue
+
+                if "observation" in message:
+                    observation = message["observation"]
+                elif message["base_version"] == version:
+                    observation = {**observation, **message["set"]}
+                    for key, values in message["append"].items():
+                        observation[key] = [*observation[key], *values]
+                else:
+                    client.emit("resync")
+                    continue
+                version = message["version"]
+
+                if sent is not None and version > sent[1]:
+                    self.stats.latencies.append(perf_counter() - sent[0])
+                    self.stats.moves += 1
+                    sent = None
+
+                if sent is None and observation["current_player"] == self._seat and observation["legal_moves"]:
+                    self._think()
+                    sent = (perf_counter(), version)
+                    client.emit("move", self._rng.choice(observation["legal_moves"]))
+        finally:
+            client.disconnect()
+
+        if ended.is_set():
+            self.stats.games += 1
+
+
+def _server_command(config: HanabiLoadTestConfig, directory: Path) -> list[str]:
+    return [
+        sys.executable,
+        "-m",
+        "hanabi",
+        "--port",
+        str(config.port),
+        "--player-list",
+        ",".join(config.player_list),
+        "--record-file",
+        str(directory / "records.csv"),
+        "--mean",
+        "0",
+        "--standard-deviation",
+        "0",
+        "--minimum-response-time",
+        "0",
+        *config.server_arguments,
+    ]
+
+
+@contextmanager
+def local_server(config: HanabiLoadTestConfig) -> Iterator[subprocess.Popen[bytes]]:
+    """Run a server in its own process, which records into a temporary directory, until the context is left."""
+    with tempfile.TemporaryDirectory() as directory:
+        server_log = Path(directory) / "server.log"
+        with server_log.open("wb") as output:
+            process = subprocess.Popen(
+                _server_command(config, Path(directory)),  # noqa: S603
+                stdout=output,
+                stderr=subprocess.STDOUT,
+            )
+
+        try:
+            start = perf_counter()
+            while not _is_serving(config.port):
+                if process.poll() is not None or perf_counter() - start > _SERVER_START_TIMEOUT:
+                    raise ServerStartError(server_log.read_text()[-_SERVER_LOG_TAIL:])
+                sleep(0.1)
+
+            log.info("Server %s is serving on port %d", process.pid, config.port)
+            yield process
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def _is_serving(port: int) -> bool:
+    try:
+        with urlopen(f"http://127.0.0.1:{port}/rooms", timeout=1):  # noqa: S310
+            return True
+    except (URLError, OSError):
+        return False
+
+
+def _measure_level(config: HanabiLoadTestConfig, concurrency: int, server_pid: int) -> LoadLevelReport:
+    url = f"http://127.0.0.1:{config.port}"
+    human_seats = [seat for seat, player in enumerate(config.player_list) if player == "human"]
+    stop = Event()
+    humans = [
+        SimulatedHuman(url, f"load{concurrency}-{room}", seat, config.think_time, stop, seed=room * 100 + seat)
+        for room in range(concurrency)
+        for seat in human_seats
+    ]
+
+    cpu_before = _cpu_seconds(server_pid)
+    start = perf_counter()
+    for human in humans:
+        human.start()
+    stop.wait(config.duration)
+    stop.set()
+    duration = perf_counter() - start
+    cpu_after = _cpu_seconds(server_pid)
+    for human in humans:
+        human.join()
+
+    latencies = [latency for human in humans for latency in human.stats.latencies]
+    return LoadLevelReport(
+        concurrency=concurrency,
+        duration=duration,
+        moves=sum(human.stats.moves for human in humans),
+        games=sum(human.stats.games for human in humans) // len(human_seats),
+        errors=sum(human.stats.errors for human in humans),
+        latency_p50=percentile(latencies, 50),
+        latency_p99=percentile(latencies, 99),
+        server_cpu=None if cpu_before is None or cpu_after is None else (cpu_after - cpu_before) / duration,
+        server_rss=_rss_bytes(server_pid),
+    )
+
+
+def load_test(config: HanabiLoadTestConfig) -> list[LoadLevelReport]:
+    """Measure a local server with more and more rooms of simulated humans playing at the same time."""
+    if "human" not in config.player_list:
+        raise NoHumanSeatError(config.player_list)
+    if find_spec("websocket") is None:
+        raise MissingWebsocketClientError
+
+    reports = []
+    with local_server(config) as server:
+        for concurrency in config.concurrency:
+            log.info("Measuring %d rooms for %.0f seconds", concurrency, config.duration)
+            report = _measure_level(config, concurrency, server.pid)
+            report.log_summary()
+            reports.append(report)
+
+    if config.report_file is not None:
+        config.report_file.write_text(json.dumps([asdict(report) for report in reports], indent=2))
+
+    return reports
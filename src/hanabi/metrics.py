@@ -0,0 +1,217 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import time
+
+from abc import ABC
+from abc import abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from typing import Iterator
+from typing import Sequence
+
+
+# seconds, from a rule based decision to the artificial delay of agents
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# https://prometheus.io/docs/instrumenting/exposition_formats/
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class LabelCountMismatchError(Exception):
+    def __init__(self, name: str, labels: Sequence[str], values: Sequence[str]) -> None:
+        super().__init__(f"Metric {name} has the labels {list(labels)}, got the values {list(values)}!")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{label}="{_escape(value)}"' for label, value in zip(labels, values)]
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._lock = Lock()
+
+    def _check(self, values: Sequence[str]) -> tuple[str, ...]:
+        if len(values) != len(self.labels):
+            raise LabelCountMismatchError(self.name, self.labels, values)
+
+        return tuple(values)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Sample lines of the metric in the text format."""
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, description, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        key = self._check(values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label values: observations per bucket, the last one counts those above all buckets, and their sum
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *values: str) -> None:
+        key = self._check(values)
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            if (counts := self._counts.get(key)) is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            counts[bucket] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, *values: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *values)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            histograms = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+
+        for key, counts, total in histograms:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket = f'le="{le}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, key, bucket)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        counter = Counter(name, description, labels)
+        self._metrics.append(counter)
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, description, labels, buckets)
+        self._metrics.append(histogram)
+        return histogram
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format."""
+        return "".join(f"{line}\n" for metric in self._metrics for line in metric.render())
+
+
+class ServerMetrics:
+    """Where the server spends the time of a move and how many moves and games it served."""
+
+    def __init__(self) -> None:
+        self.registry = MetricsRegistry()
+        self.phase_seconds = self.registry.histogram(
+            "hanabi_move_phase_seconds",
+            "Seconds spent in each phase of a move, by the class of the player who moved.",
+            ("phase", "agent"),
+        )
+        self.moves = self.registry.counter("hanabi_moves_total", "Moves made.", ("agent",))
+        self.illegal_moves = self.registry.counter(
+            "hanabi_illegal_moves_total",
+            "Moves rejected as illegal.",
+            ("agent",),
+        )
+        self.speculative_replies = self.registry.counter(
+            "hanabi_speculative_replies_total",
+            "Agent moves after a human, by whether a reply chosen while the human thought was used.",
+            ("result",),
+        )
+        self.games_started = self.registry.counter("hanabi_games_started_total", "Games dealt in a room.")
+        self.games_finished = self.registry.counter(
+            "hanabi_games_finished_total",
+            "Games which ended, by how they ended.",
+            ("end_status",),
+        )
@@ -35,6 +35,9 @@ from typing import Literal
 from typing import TypedDict
 from typing import Union
 
+from hanabi_learning_environment.pyhanabi import HanabiMove
+from hanabi_learning_environment.pyhanabi import color_char_to_idx
+
 from hanabi.card import Card
 
 
@@ -73,3 +76,47 @@ def is_discard_or_play(move: Move) -> PlayMove | DiscardMove | None:
         return move  # type: ignore[return-value]
 
     return None
+
+
+def sanitize_move(move: Move) -> Move:
+    if move["action_type"] == "PLAY" or move["action_type"] == "DISCARD":
+        return {  # type: ignore[return-value]
+            "action_type": move["action_type"],
+            "card_index": int(move["card_index"]),
+        }
+
+    if move["action_type"] == "REVEAL_COLOR":
+        return {
+            "action_type": move["action_type"],
+            "color": str(move["color"]),
+            "target_offset": int(move["target_offset"]),
+        }
+
+    if move["action_type"] == "REVEAL_RANK":
+        return {
+            "action_type": move["action_type"],
+            "rank": int(move["rank"]),
+            "target_offset": int(move["target_offset"]),
+        }
+
+    # this is completely unreachable according to mypy but other linters
+    # have problems understanding types
+    msg = f"move={move!r} has no recognized type"  # type: ignore[unreachable]
+    raise ValueError(msg)
+
+
+def to_hanabi_move(move: Move) -> HanabiMove:
+    if move["action_type"] == "PLAY":
+        return HanabiMove.get_play_move(move["card_index"])
+
+    if move["action_type"] == "DISCARD":
+        return HanabiMove.get_discard_move(move["card_index"])
+
+    if move["action_type"] == "REVEAL_COLOR":
+        return HanabiMove.get_reveal_color_move(move["target_offset"], color_char_to_idx(move["color"]))
+
+    if move["action_type"] == "REVEAL_RANK":
+        return HanabiMove.get_reveal_rank_move(move["target_offset"], move["rank"])
+
+    msg = f"move={move!r} has no recognized type"  # type: ignore[unreachable]
+    raise ValueError(msg)
@@ -31,7 +31,11 @@
 #
 from __future__ import annotations
 
+from functools import cached_property
+from typing import Any
+from typing import Dict
 from typing import List
+from typing import Mapping
 from typing import TypedDict
 
 from hanabi_learning_environment.pyhanabi import COLOR_CHAR
@@ -129,10 +133,41 @@ def from_hanabi_observation(
         ],
         "num_players": observation.num_players(),
         "event_log": event_log,
-        "vectorized": env.observation_encoder.encode(observation),
     }
 
 
+class VectorizedEncoding:
+    """Encoding of an observation for learned agents, computed on first use as it is a few hundred ints long."""
+
+    def __init__(self, env: HanabiEnv, observation: HanabiObservation) -> None:
+        # the encoder only points to the game, so the env has to be kept alive until the observation was encoded
+        self._env = env
+        self._observation = observation
+
+    @cached_property
+    def vectorized(self) -> list[int]:
+        return self._env.observation_encoder.encode(self._observation)  # type: ignore[no-any-return]
+
+
+class LazyAgentObservation(Dict[str, Any]):
+    """
+    Agent observation which only encodes its "vectorized" entry once it is read.
+
+    Only item access computes the entry, `in` and `get` do not see it before that.
+    """
+
+    def __init__(self, observation: Mapping[str, Any], encoding: VectorizedEncoding) -> None:
+        super().__init__(observation)
+        self._encoding = encoding
+
+    def __missing__(self, key: str) -> Any:  # noqa: ANN401
+        if key != "vectorized":
+            raise KeyError(key)
+
+        self[key] = vectorized = self._encoding.vectorized
+        return vectorized
+
+
 def lighten_observation(full: FullObservation) -> FlyweightObservation:
     observation = full.copy()
     observation["player_observations"] = [player.copy() for player in full["player_observations"]]
@@ -142,6 +177,9 @@ def lighten_observation(full: FullObservation) -> FlyweightObservation:
             del player["pyhanabi"]  # type: ignore[misc]
         if "vectorized" in player:
             del player["vectorized"]  # type: ignore[misc]
+        if "event_log" in player:
+            # the events are recorded as moves already
+            del player["event_log"]  # type: ignore[misc]
 
     return observation  # type: ignore[return-value]
 
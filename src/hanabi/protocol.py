@@ -0,0 +1,102 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from typing import Any
+from typing import Dict
+from typing import TypedDict
+
+from hanabi.observations import PlayerSpecificObservation
+
+
+ObservationSnapshot = Dict[str, Any]
+
+
+class GameStateMessage(TypedDict):
+    """Full observation of a seat, a keyframe for the delta protocol."""
+
+    player_id: int
+    version: int
+    observation: PlayerSpecificObservation
+
+
+class GameStatePatchMessage(TypedDict):
+    """
+    Changes of a seat's observation since `base_version`.
+
+    Clients replace every entry in `set` and extend every list in `append`. A client
+    which is not at `base_version` has to ask for a keyframe via a `resync` event.
+    """
+
+    player_id: int
+    version: int
+    base_version: int
+    set: dict[str, Any]
+    append: dict[str, list[Any]]
+
+
+def snapshot_observation(observation: PlayerSpecificObservation) -> ObservationSnapshot:
+    # lists like the event log keep growing after being sent, so they have to be copied
+    return {key: list(value) if isinstance(value, list) else value for key, value in observation.items()}
+
+
+def diff_observation(
+    player: int,
+    base_version: int,
+    base: ObservationSnapshot,
+    version: int,
+    observation: PlayerSpecificObservation,
+) -> GameStatePatchMessage:
+    patch: GameStatePatchMessage = {
+        "player_id": player,
+        "version": version,
+        "base_version": base_version,
+        "set": {},
+        "append": {},
+    }
+
+    for key, value in observation.items():
+        old_value = base.get(key)
+        if value == old_value:
+            continue
+
+        if (
+            isinstance(value, list)
+            and isinstance(old_value, list)
+            and len(value) > len(old_value)
+            and value[: len(old_value)] == old_value
+        ):
+            patch["append"][key] = value[len(old_value) :]
+        else:
+            patch["set"][key] = value
+
+    return patch
@@ -32,6 +32,10 @@
 from __future__ import annotations
 
 import csv
+import json
+import math
+import os
+import struct
 
 from dataclasses import dataclass
 from datetime import datetime
@@ -39,12 +43,27 @@ from datetime import timezone
 from itertools import tee
 from logging import getLogger
 from pathlib import Path
+from queue import Empty
+from queue import Queue
+from threading import Thread
+from time import monotonic
+from typing import IO
+from typing import Any
 from typing import Final
 from typing import Iterable
 from typing import Iterator
+from typing import NamedTuple
 from typing import TypeVar
 
+import numpy as np
+
+from hanabi_learning_environment.pyhanabi import HanabiGame
+from hanabi_learning_environment.pyhanabi import ObservationEncoder
+from hanabi_learning_environment.pyhanabi import ObservationEncoderType
+
+from hanabi.config.game import HanabiGameConfig
 from hanabi.moves import Move
+from hanabi.moves import to_hanabi_move
 from hanabi.observations import FlyweightObservation
 from hanabi.observations import FullObservation
 from hanabi.observations import lighten_observation
@@ -87,12 +106,339 @@ class HanabiRecord:
         return ["player", "player_type", "move", "observation_after", "reward", "time_delta_seconds", "vectorized_game_state"]
 
 
+BINARY_RECORD_SUFFIX: Final[str] = ".hrec"
+
+_BINARY_MAGIC: Final[bytes] = b"HREC"
+_BINARY_VERSION: Final[int] = 1
+# magic, format version and length of the json header that follows
+_BINARY_PREAMBLE = struct.Struct("<4sHI")
+_NO_MOVE: Final[int] = -1
+
+
+class InvalidBinaryRecordError(Exception):
+    def __init__(self, record_file: Path, reason: str) -> None:
+        super().__init__(f"{record_file} is not a binary hanabi record: {reason}")
+
+
+def _binary_record_dtype(players: int, vectorized_length: int) -> np.dtype[Any]:
+    return np.dtype(
+        [
+            ("player", "<i1"),
+            ("player_type", "<i1"),
+            ("move", "<i2"),
+            ("reward", "<f4"),
+            ("time", "<f8"),
+            ("vectorized", "u1", (players, math.ceil(vectorized_length / 8))),
+        ],
+    )
+
+
+def _vectorized_length(game: HanabiGame) -> int:
+    return ObservationEncoder(game, ObservationEncoderType.CANONICAL).shape()[0]  # type: ignore[no-any-return]
+
+
+class BinaryRecordWriter:
+    """
+    Writes records into the compact binary format read by `HanabiRecordReader`.
+
+    A json header with the game config is followed by fixed size records: the player, an index
+    into the header's player types, the move as its uid in the game, the reward (NaN for none),
+    the unix time and the vectorized observation of every player packed into bits. Observations
+    beyond that are only kept in the csv.
+    """
+
+    def __init__(self, record_file: Path, game_config: HanabiGameConfig, player_types: list[str]) -> None:
+        self._game = HanabiGame(game_config)
+        self._player_types = player_types
+        vectorized_length = _vectorized_length(self._game)
+        self._dtype = _binary_record_dtype(self._game.num_players(), vectorized_length)
+
+        header = json.dumps(
+            {
+                "game_config": game_config,
+                "player_types": player_types,
+                "vectorized_length": vectorized_length,
+            },
+        ).encode()
+        # records start 8 byte aligned
+        header += b" " * (-(_BINARY_PREAMBLE.size + len(header)) % 8)
+
+        self.path = record_file
+        record_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = record_file.open("wb")
+        self._file.write(_BINARY_PREAMBLE.pack(_BINARY_MAGIC, _BINARY_VERSION, len(header)))
+        self._file.write(header)
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def write(self, record: HanabiRecord) -> None:
+        self.write_encoded(self.encode(record))
+
+    def encode(self, record: HanabiRecord) -> bytes:
+        line = np.zeros((), dtype=self._dtype)
+        line["player"] = record.player
+        line["player_type"] = (
+            self._player_types.index(record.player_type) if record.player_type in self._player_types else -1
+        )
+        line["move"] = _NO_MOVE if record.move is None else self._game.get_move_uid(to_hanabi_move(record.move))
+        line["reward"] = math.nan if record.reward is None else record.reward
+        line["time"] = record.time.timestamp()
+        line["vectorized"] = np.packbits(
+            [player["vectorized"] for player in record.observation_after["player_observations"]],
+            axis=1,
+        )
+        return line.tobytes()
+
+    def write_encoded(self, data: bytes) -> None:
+        self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class RecordedTurn(NamedTuple):
+    player: int
+    player_type: str
+    move: Move | None
+    reward: float | None
+    time: datetime
+    vectorized: np.ndarray[Any, np.dtype[np.uint8]]
+
+
+class HanabiRecordReader:
+    """
+    Reads binary records, memory mapped so only the accessed turns are ever loaded.
+
+    Whole columns are available as arrays, e.g. `reader.column("reward")`, single turns by
+    index and all of them by iterating. A recording cut short by a crash is read up to its last
+    complete turn.
+    """
+
+    def __init__(self, record_file: Path) -> None:
+        self.record_file = record_file
+
+        with record_file.open("rb") as file:
+            preamble = file.read(_BINARY_PREAMBLE.size)
+            if len(preamble) < _BINARY_PREAMBLE.size:
+                raise InvalidBinaryRecordError(record_file, "file is too short")
+
+            magic, version, header_length = _BINARY_PREAMBLE.unpack(preamble)
+            if magic != _BINARY_MAGIC:
+                raise InvalidBinaryRecordError(record_file, "unknown file type")
+            if version != _BINARY_VERSION:
+                raise InvalidBinaryRecordError(record_file, f"unsupported version {version}")
+
+            header = json.loads(file.read(header_length))
+
+        self.game_config: HanabiGameConfig = header["game_config"]
+        self.player_types: list[str] = header["player_types"]
+        self.vectorized_length: int = header["vectorized_length"]
+        self._game = HanabiGame(self.game_config)
+
+        dtype = _binary_record_dtype(self._game.num_players(), self.vectorized_length)
+        offset = _BINARY_PREAMBLE.size + header_length
+        turns = (record_file.stat().st_size - offset) // dtype.itemsize
+        self._records: np.ndarray[Any, np.dtype[Any]] = (
+            np.memmap(record_file, dtype=dtype, mode="r", offset=offset, shape=(turns,))
+            if turns > 0
+            else np.empty(0, dtype=dtype)
+        )
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, turn: int) -> RecordedTurn:
+        record = self._records[turn]
+        move = int(record["move"])
+        reward = float(record["reward"])
+        player_type = int(record["player_type"])
+
+        return RecordedTurn(
+            player=int(record["player"]),
+            player_type=HanabiRecorder.NO_PLAYER_MOVED_TYPE if player_type < 0 else self.player_types[player_type],
+            move=None if move == _NO_MOVE else self._game.get_move(move).to_dict(),
+            reward=None if math.isnan(reward) else reward,
+            time=datetime.fromtimestamp(float(record["time"]), tz=timezone.utc),
+            vectorized=self._unpack(record["vectorized"]),
+        )
+
+    def __iter__(self) -> Iterator[RecordedTurn]:
+        for turn in range(len(self)):
+            yield self[turn]
+
+    def column(self, name: str) -> np.ndarray[Any, np.dtype[Any]]:
+        """Memory mapped column of all turns, one of: player, player_type, move, reward, time."""
+        return self._records[name]
+
+    def vectorized(self, turns: slice | int | None = None) -> np.ndarray[Any, np.dtype[np.uint8]]:
+        """Unpacked vectorized observations of the given or all turns, shaped (turns..., players, length)."""
+        packed = self._records["vectorized"]
+        return self._unpack(packed if turns is None else packed[turns])
+
+    def _unpack(self, packed: np.ndarray[Any, np.dtype[np.uint8]]) -> np.ndarray[Any, np.dtype[np.uint8]]:
+        return np.unpackbits(packed, axis=-1, count=self.vectorized_length)
+
+
+class _RecordWriter(Thread):
+    """Writes records as csv lines in the background, so neither encoding nor disk io block a game."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        record_file: Path,
+        *,
+        max_pending: int,
+        fsync_interval: float,
+        max_file_bytes: int | None,
+        binary_writer: BinaryRecordWriter | None,
+    ) -> None:
+        # not a daemon, the interpreter waits for pending records before exiting
+        super().__init__(name=f"record-writer-{record_file.name}")
+        self._record_file = record_file
+        self._fsync_interval = fsync_interval
+        self._max_file_bytes = max_file_bytes
+        self._binary_writer = binary_writer
+        # bounded, a game outrunning the disk waits instead of piling up observations in memory
+        self._pending: Queue[HanabiRecord | None] = Queue(maxsize=max_pending)
+
+        self._part = 0
+        self._last_fsync = monotonic()
+        self._unsynced = False
+        self._previous_time: datetime | None = None
+        # created right away so nobody else picks the same file in the meantime
+        self._file = self._create_part()
+
+    def put(self, record: HanabiRecord) -> None:
+        self._pending.put(record)
+
+    def close(self) -> None:
+        self._pending.put(None)
+
+    def _part_file(self) -> Path:
+        if self._part == 0:
+            return self._record_file
+
+        return self._record_file.with_name(f"{self._record_file.stem}.{self._part}{self._record_file.suffix}")
+
+    def _create_part(self) -> IO[str]:
+        record_file = self._part_file()
+        log.debug("Writing records into: %s", record_file)
+        record_file.parent.mkdir(parents=True, exist_ok=True)
+
+        file = record_file.open("w", newline="")
+        csv.writer(file).writerow(HanabiRecord.get_title_line())
+        return file
+
+    def _open(self) -> IO[str]:
+        if self._max_file_bytes is not None and self._file.tell() >= self._max_file_bytes:
+            self._sync_and_close(self._file)
+            self._part += 1
+            self._file = self._create_part()
+
+        return self._file
+
+    def _sync_and_close(self, file: IO[str] | BinaryRecordWriter) -> None:
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+
+    def _write(self, record: HanabiRecord) -> None:
+        # encoded for both files first, a record which cannot be encoded is written into neither
+        try:
+            line = record.to_line(self._previous_time or record.time)
+            binary_line = None if self._binary_writer is None else self._binary_writer.encode(record)
+        except Exception:
+            log.exception("Could not encode record, it is missing from %s", self._record_file)
+            return
+
+        try:
+            file = self._open()
+            csv.writer(file).writerow(line)
+        except Exception:
+            log.exception("Could not write record into %s", self._record_file)
+            return
+
+        if self._binary_writer is not None and binary_line is not None:
+            try:
+                self._binary_writer.write_encoded(binary_line)
+            except Exception:
+                log.exception("Could not write record into %s, it is only in %s", self._binary_writer.path, file.name)
+
+        self._previous_time = record.time
+
+        # flushed records survive a crash of the server, synced ones a crash of the machine
+        file.flush()
+        if self._binary_writer is not None:
+            self._binary_writer.flush()
+        self._unsynced = True
+        if monotonic() - self._last_fsync >= self._fsync_interval:
+            self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        if self._binary_writer is not None:
+            os.fsync(self._binary_writer.fileno())
+        self._unsynced = False
+        self._last_fsync = monotonic()
+
+    def run(self) -> None:
+        while True:
+            try:
+                # an idle writer wakes up to sync the last records too
+                record = self._pending.get(timeout=self._fsync_interval or None)
+            except Empty:  # noqa: PERF203
+                if self._unsynced:
+                    self._sync()
+                continue
+
+            if record is None:
+                break
+            self._write(record)
+
+        self._sync_and_close(self._file)
+        if self._binary_writer is not None:
+            self._sync_and_close(self._binary_writer)
+        log.debug("Finished writing records into: %s", self._record_file)
+
+
 class HanabiRecorder:
+    """
+    Records every move of a game.
+
+    Without a record file the records are kept in memory until `write_log`. With one they are
+    streamed into it by a background writer, which starts a new numbered file whenever the
+    current one grew beyond `max_file_bytes`. The same writer also feeds the `binary_writer`,
+    which is never split.
+    """
+
     NO_PLAYER_MOVED: Final[int] = -1
     NO_PLAYER_MOVED_TYPE: Final[str] = "init"
 
-    def __init__(self) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        record_file: Path | None = None,
+        *,
+        max_pending: int = 256,
+        fsync_interval: float = 1.0,
+        max_file_bytes: int | None = None,
+        binary_writer: BinaryRecordWriter | None = None,
+    ) -> None:
         self.records: list[HanabiRecord] = []
+        self._closed = False
+        self._writer: _RecordWriter | None = None
+
+        if record_file is not None:
+            self._writer = _RecordWriter(
+                record_file,
+                max_pending=max_pending,
+                fsync_interval=fsync_interval,
+                max_file_bytes=max_file_bytes,
+                binary_writer=binary_writer,
+            )
+            self._writer.start()
 
     def add_record(  # noqa: PLR0913
         self,
@@ -102,18 +448,36 @@ class HanabiRecorder:
         reward: float | None,
         observation_after: FullObservation,
     ) -> None:
-        self.records.append(
-            HanabiRecord(
-                player,
-                player_type,
-                move,
-                observation_after,
-                datetime.now(tz=timezone.utc),
-                reward,
-            ),
+        if self._closed:
+            # e.g. an agent finishing its move while the room gets closed
+            log.warning("Ignoring record of player %s, the recorder was already closed", player)
+            return
+
+        record = HanabiRecord(
+            player,
+            player_type,
+            move,
+            observation_after,
+            datetime.now(tz=timezone.utc),
+            reward,
         )
 
-    # TODO(ms): make optional / stdout / file / etc
+        if self._writer is not None:
+            self._writer.put(record)
+        else:
+            self.records.append(record)
+
+    def close(self, *, wait: bool = False) -> None:
+        """Stop recording, pending records are still written unless the recorder has no file."""
+        if self._closed:
+            return
+
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close()
+            if wait:
+                self._writer.join()
+
     def write_log(self, logfile: Path = Path("logfile.csv")) -> None:
         log.debug("Writing csv into: %s", str(logfile))
 
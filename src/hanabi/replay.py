@@ -0,0 +1,178 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from logging import getLogger
+from typing import Sequence
+
+from hanabi_learning_environment import pyhanabi
+from hanabi_learning_environment.pyhanabi import HanabiGame
+from hanabi_learning_environment.pyhanabi import HanabiMove
+from hanabi_learning_environment.pyhanabi import HanabiState
+from hanabi_learning_environment.pyhanabi import color_idx_to_char
+from hanabi_learning_environment.rl_env import HanabiEnv
+
+from hanabi.config.game import HanabiGameConfig
+from hanabi.moves import Move
+from hanabi.moves import to_hanabi_move
+from hanabi.observations import Event
+from hanabi.observations import PlayerSpecificObservation
+from hanabi.observations import from_hanabi_observation
+from hanabi.recording import HanabiRecordReader
+
+
+log = getLogger(__name__)
+
+
+class UnreplayableGameError(Exception):
+    def __init__(self) -> None:
+        super().__init__("Games dealt with a random seed (-1) cannot be replayed")
+
+
+class IllegalReplayMoveError(Exception):
+    def __init__(self, turn: int, move: Move | int) -> None:
+        super().__init__(f"Move {move!r} of turn {turn} is not legal in the replayed game")
+
+
+class HanabiReplay:
+    """
+    Rebuilds any turn of a game from its seed and moves.
+
+    The game is dealt once up front, which captures every dealt card. After that a turn is
+    restored from the closest state kept every `checkpoint_interval` moves by re-applying at
+    most that many moves and deals. Turn 0 is the freshly dealt game, turn n the state after
+    the n-th move.
+    """
+
+    def __init__(
+        self,
+        config: HanabiGameConfig,
+        moves: Sequence[Move | int],
+        *,
+        checkpoint_interval: int = 10,
+    ) -> None:
+        if config["seed"] < 0:
+            raise UnreplayableGameError
+        if checkpoint_interval < 1:
+            msg = f"checkpoint_interval={checkpoint_interval} has to be at least 1"
+            raise ValueError(msg)
+
+        self._config = config
+        self._checkpoint_interval = checkpoint_interval
+        # only used for its game and encoder, same as in SSEHanabiGame
+        self._env = HanabiEnv(config)
+
+        state = self._game.new_initial_state()
+        # length of the move history, deals included, once every turn is reached
+        self._history_lengths = [self._deal(state)]
+        self._checkpoints: dict[int, HanabiState] = {0: state.copy()}
+
+        for turn, move in enumerate(moves, start=1):
+            hanabi_move = self._game.get_move(move) if isinstance(move, int) else to_hanabi_move(move)
+            if not state.move_is_legal(hanabi_move):
+                raise IllegalReplayMoveError(turn, move)
+
+            state.apply_move(hanabi_move)
+            self._history_lengths.append(self._history_lengths[-1] + 1 + self._deal(state))
+            if turn % checkpoint_interval == 0:
+                self._checkpoints[turn] = state.copy()
+
+        history = state.move_history()
+        self._history: list[HanabiMove] = [item.move() for item in history]
+        self._events = [self._event(history[length]) for length in self._history_lengths[:-1]]
+
+        log.debug("Replaying %s turns with %s checkpoints", len(self), len(self._checkpoints))
+
+    @classmethod
+    def from_record(cls, record: HanabiRecordReader, *, checkpoint_interval: int = 10) -> HanabiReplay:
+        # the initial record has no move
+        moves = [int(move) for move in record.column("move") if move >= 0]
+        return cls(record.game_config, moves, checkpoint_interval=checkpoint_interval)
+
+    @property
+    def _game(self) -> HanabiGame:
+        return self._env.game
+
+    @property
+    def config(self) -> HanabiGameConfig:
+        return self._config
+
+    @property
+    def events(self) -> list[Event]:
+        """Every move of the game, with the played or discarded card like in a live game."""
+        return self._events
+
+    def __len__(self) -> int:
+        return len(self._history_lengths)
+
+    @staticmethod
+    def _deal(state: HanabiState) -> int:
+        deals = 0
+        while state.cur_player() == pyhanabi.CHANCE_PLAYER_ID:
+            state.deal_random_card()
+            deals += 1
+
+        return deals
+
+    @staticmethod
+    def _event(item: pyhanabi.HanabiHistoryItem) -> Event:
+        move: Move = item.move().to_dict()
+        if move["action_type"] in ("PLAY", "DISCARD"):
+            move["played_card"] = {"color": color_idx_to_char(item.color()), "rank": item.rank()}
+
+        return Event(move=move, player_index=item.player())
+
+    def state(self, turn: int) -> HanabiState:
+        """Restore the state of the given turn, it is not shared with the replay and may be modified."""
+        if not 0 <= turn < len(self):
+            msg = f"turn={turn} is not part of a game with {len(self)} turns"
+            raise IndexError(msg)
+
+        checkpoint = turn - turn % self._checkpoint_interval
+        state = self._checkpoints[checkpoint].copy()
+        for move in self._history[self._history_lengths[checkpoint] : self._history_lengths[turn]]:
+            state.apply_move(move)
+
+        return state
+
+    def observation(self, turn: int, player: int) -> PlayerSpecificObservation:
+        state = self.state(turn)
+        return from_hanabi_observation(
+            state.cur_player(),
+            state.fireworks(),
+            state.observation(player),
+            self._env,
+            self._events[:turn],
+        )
+
+    def vectorized(self, turn: int, player: int) -> list[int]:
+        return self._env.observation_encoder.encode(self.state(turn).observation(player))  # type: ignore[no-any-return]
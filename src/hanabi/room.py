@@ -0,0 +1,368 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import re
+
+from dataclasses import fields
+from dataclasses import replace
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+from typing import Any
+from typing import Final
+from typing import Sequence
+
+from hanabi_learning_environment.rl_env import Agent
+
+from hanabi.agents import AGENT_MAP
+from hanabi.agents import get_players
+from hanabi.agents.human_agent import HumanPlayer
+from hanabi.agents.timing import distribution_from_config
+from hanabi.agents.timing import get_delay
+from hanabi.card import Color
+from hanabi.card import Rank
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.game import with_concrete_seed
+from hanabi.config.research import HanabiResearchConfig
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import Move
+from hanabi.observations import Hand
+from hanabi.observations import PlayerSpecificObservation
+from hanabi.protocol import GameStateMessage
+from hanabi.protocol import GameStatePatchMessage
+from hanabi.protocol import ObservationSnapshot
+from hanabi.protocol import diff_observation
+from hanabi.protocol import snapshot_observation
+from hanabi.recording import BINARY_RECORD_SUFFIX
+from hanabi.recording import BinaryRecordWriter
+from hanabi.recording import HanabiRecorder
+from hanabi.snapshot import RoomSnapshot
+from hanabi.snapshot import SnapshotWriter
+from hanabi.snapshot import snapshot_file
+from hanabi.speculation import Speculation
+
+
+log = getLogger(__name__)
+
+DEFAULT_ROOM: Final[str] = "default"
+
+_ROOM_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# research options which are not part of a snapshot, as they are the same for every room of a server
+_UNSNAPSHOTTED_OPTIONS = frozenset({"player_list", "record_file"})
+
+
+class InvalidSeatError(Exception):
+    def __init__(self, room_id: str, seat: object) -> None:
+        self.room_id = room_id
+        self.seat = seat
+        super().__init__(f"Seat {seat!r} does not exist in room {room_id!r}!")
+
+
+class InvalidRoomIdError(Exception):
+    def __init__(self, room_id: str) -> None:
+        self.room_id = room_id
+        super().__init__(f"Room id {room_id!r} is invalid, only 1-64 of [A-Za-z0-9_-] are allowed!")
+
+
+def validate_room_id(room_id: str) -> str:
+    if _ROOM_ID_PATTERN.match(room_id) is None:
+        raise InvalidRoomIdError(room_id)
+
+    return room_id
+
+
+def record_file_for_room(record_file: Path, room_id: str) -> Path:
+    """
+    Get an unused record file for the given room.
+
+    The default room records into the configured file, every other room next to it
+    with the room id appended. If a game in that room was already recorded, a counter
+    is appended so no recording is ever overwritten.
+    """
+    stem = record_file.stem if room_id == DEFAULT_ROOM else f"{record_file.stem}_{room_id}"
+
+    candidate = record_file.with_name(f"{stem}{record_file.suffix}")
+    counter = 1
+    while candidate.exists():
+        counter += 1
+        candidate = record_file.with_name(f"{stem}_{counter}{record_file.suffix}")
+
+    return candidate
+
+
+class HanabiRoom:
+    """A single game with its own agents, recorder and research configuration."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        room_id: str,
+        game_config: HanabiGameConfig,
+        research_config: HanabiResearchConfig,
+        *,
+        snapshot_directory: Path | None = None,
+        moves: Sequence[int] = (),
+    ) -> None:
+        """Open a room, whose game continues after the `moves` if given, e.g. those of a snapshot."""
+        self.room_id = validate_room_id(room_id)
+        self.research_config = research_config
+        self.record_file = record_file_for_room(research_config.record_file, room_id)
+        # recordings can only be replayed with the seed the cards were actually dealt with
+        game_config = with_concrete_seed(game_config)
+
+        self.game = SSEHanabiGame(
+            game_config,
+            research_config.player_list,
+            event_window=research_config.only_show_last_n_events,
+            recorder=HanabiRecorder(
+                self.record_file,
+                fsync_interval=research_config.record_fsync_interval,
+                max_file_bytes=research_config.record_max_bytes,
+                binary_writer=(
+                    BinaryRecordWriter(
+                        self.record_file.with_suffix(BINARY_RECORD_SUFFIX),
+                        game_config,
+                        [agent.__name__ for agent in research_config.player_list],
+                    )
+                    if research_config.binary_record
+                    else None
+                ),
+            ),
+        )
+        self.players: list[Agent] = [agent(game_config) for agent in research_config.player_list]
+        self.agent_lock = Lock()
+        # replies of the next agent chosen while a human thinks
+        self.speculation: Speculation | None = None
+        # connection id -> seat, every connection only ever sees the observation of its own seat
+        self.connections: dict[str, int] = {}
+        # since when nobody is connected, a room left alone for too long is reclaimed even during its game
+        self.idle_since = monotonic()
+
+        self._default_delay = distribution_from_config(research_config)
+        self._last_moves: dict[int, list[Move]] = {idx: [] for idx in range(len(self.players))}
+        self._recorded = False
+        # version and observation last sent to every seat, the base of the next patch for it
+        self._sent: dict[int, tuple[int, ObservationSnapshot]] = {}
+
+        log.info(
+            "Room %s is playing a game with seed %s with: %s",
+            room_id,
+            game_config["seed"],
+            [a.__class__.__name__ for a in self.players],
+        )
+
+        for move_uid in moves:
+            player = self.game.current_player
+            move = self.game.move_of_uid(move_uid)
+            self.game.make_move(move)
+            self.update_move_lists(player, move)
+
+        # only written once the moves were replayed, a failing replay keeps the previous snapshot
+        self._snapshot: SnapshotWriter | None = None
+        if snapshot_directory is not None:
+            snapshot = RoomSnapshot(
+                self.room_id,
+                game_config,
+                [AGENT_MAP.name_of(agent) for agent in research_config.player_list],
+                {
+                    option.name: getattr(research_config, option.name)
+                    for option in fields(research_config)
+                    if option.name not in _UNSNAPSHOTTED_OPTIONS
+                },
+                list(moves),
+            )
+            self._snapshot = SnapshotWriter(snapshot_file(snapshot_directory, self.room_id), snapshot)
+
+    @classmethod
+    def restore(
+        cls,
+        snapshot: RoomSnapshot,
+        research_config: HanabiResearchConfig,
+        snapshot_directory: Path,
+    ) -> HanabiRoom:
+        """Rebuild the room of a snapshot, `research_config` provides the options every room shares."""
+        return cls(
+            snapshot.room_id,
+            snapshot.game_config,
+            replace(research_config, player_list=get_players(snapshot.players), **snapshot.research_options),
+            snapshot_directory=snapshot_directory,
+            moves=snapshot.moves,
+        )
+
+    @property
+    def is_abandoned(self) -> bool:
+        return self.game.is_terminal() and not self.connections
+
+    def is_idle(self, timeout: float) -> bool:
+        """Whether nobody was connected for at least `timeout` seconds and no agent is still playing."""
+        return not self.connections and not self.agent_lock.locked() and monotonic() - self.idle_since >= timeout
+
+    @property
+    def watched_seats(self) -> list[int]:
+        return sorted(set(self.connections.values()))
+
+    def seat_channel(self, seat: int) -> str:
+        return f"{self.room_id}/{seat}"
+
+    def validate_seat(self, seat: Any) -> int:  # noqa: ANN401
+        try:
+            player = int(seat)
+        except (TypeError, ValueError) as e:
+            raise InvalidSeatError(self.room_id, seat) from e
+
+        if not 0 <= player < len(self.players):
+            raise InvalidSeatError(self.room_id, seat)
+
+        return player
+
+    @property
+    def current_agent(self) -> Agent | None:
+        if self.game.is_terminal():
+            return None
+
+        agent = self.players[self.game.current_player]
+        return None if isinstance(agent, HumanPlayer) else agent
+
+    def warm_up_agents(self) -> None:
+        for agent in self.players:
+            if (warm_up := getattr(agent, "warm_up", None)) is not None:
+                log.info("Warming up %s of room %s", agent.__class__.__name__, self.room_id)
+                warm_up()
+
+    def get_delay(self, agent: Agent) -> float:
+        return get_delay(agent, self._default_delay)
+
+    def save_move(self, move: Move) -> None:
+        """Add a move, which was made in the game, to the snapshot of the room."""
+        if self._snapshot is not None and (move_uid := self.game.move_uid(move)) is not None:
+            self._snapshot.add_move(move_uid)
+
+    def discard_snapshot(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.discard()
+            self._snapshot = None
+
+    def record(self) -> None:
+        if self._recorded:
+            return
+
+        # the moves are already streamed into the record file, only the pending ones are left to write
+        log.info("Finishing record log of room %s in %s", self.room_id, self.record_file)
+        self.game.recorder.close()
+        self._recorded = True
+
+    def _is_revealed(self, player: int, fact: Rank | Color | None) -> bool:
+        if isinstance(fact, int):
+            return any(
+                last_move["rank"] == fact
+                for last_move in self._last_moves[player]
+                if last_move["action_type"] == "REVEAL_RANK"
+            )
+
+        return any(
+            last_move["color"] == fact
+            for last_move in self._last_moves[player]
+            if last_move["action_type"] == "REVEAL_COLOR"
+        )
+
+    def _correct_knowledge(self, player: int, card_knowledge: list[Hand]) -> list[Hand]:
+        # we only want to manipulate the knowledge for idx=0 as this is players own hand
+        own_hand: Hand = [
+            {
+                "rank": card["rank"] if self._is_revealed(player, card["rank"]) else -1,
+                "color": card["color"] if self._is_revealed(player, card["color"]) else None,
+            }
+            for card in card_knowledge[0]
+        ]
+
+        return [own_hand, *card_knowledge[1:]]
+
+    def update_move_lists(self, player: int, move: Move) -> None:
+        if self.research_config.always_show_full_knowledge:
+            return
+
+        for idx in range(len(self.players)):
+            if idx == player:
+                # clear player who made a move
+                self._last_moves[idx] = []
+                continue
+
+            # TODO(ms): move could reveal something not on my side
+            self._last_moves[idx].append(move)
+
+    def get_client_observation(self, player: int) -> PlayerSpecificObservation:
+        """Observation of the given player with all research restrictions applied."""
+        # the game shares its observations, so only ever replace entries of a copy
+        observation = self.game.get_observation(player).copy()
+        log.debug("Player %s specific observations: %s", player, observation)
+
+        if not self.research_config.always_show_full_knowledge:
+            observation["card_knowledge"] = self._correct_knowledge(
+                player, observation["card_knowledge"],
+            )
+
+        if self.research_config.disable_discard_pile:
+            observation["discard_pile"] = None
+        elif (
+            self.research_config.only_show_last_n_discards > -1
+            and observation["discard_pile"] is not None
+        ):
+            observation["discard_pile"] = observation["discard_pile"][
+                -self.research_config.only_show_last_n_discards :
+            ]
+
+        if self.research_config.only_show_last_n_events > -1:
+            observation["event_log"] = self.game.windowed_event_log
+
+        return observation
+
+    def keyframe(self, player: int, *, remember: bool) -> GameStateMessage:
+        observation = self.get_client_observation(player)
+        version = self.game.version
+        if remember:
+            self._sent[player] = (version, snapshot_observation(observation))
+
+        return {"player_id": player, "version": version, "observation": observation}
+
+    def patch(self, player: int) -> GameStatePatchMessage | None:
+        """Get the changes since the last message sent to the seat or None if it needs a keyframe."""
+        if (sent := self._sent.get(player)) is None:
+            return None
+
+        base_version, base = sent
+        observation = self.get_client_observation(player)
+        version = self.game.version
+        self._sent[player] = (version, snapshot_observation(observation))
+
+        return diff_observation(player, base_version, base, version, observation)
@@ -31,30 +31,155 @@
 #
 from __future__ import annotations
 
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from functools import partial
 from logging import getLogger
 from pathlib import Path
-from threading import Lock
+from time import monotonic
+from time import perf_counter
 from typing import Any
+from typing import Callable
+from typing import Sequence
+from typing import TypeVar
 
 from flask import Flask
+from flask import Response
+from flask import jsonify
+from flask import request
+from flask_socketio import ConnectionRefusedError
 from flask_socketio import SocketIO
-from flask_socketio import emit
-
+from flask_socketio import join_room
+from flask_socketio import leave_room
+from hanabi_learning_environment.pyhanabi import HanabiGame
+from hanabi_learning_environment.rl_env import Agent
+
+from hanabi.agents import RAINBOW_BACKENDS
+from hanabi.agents import RAINBOW_TYPES
+from hanabi.agents import AgentNotFoundError
+from hanabi.agents import get_players
 from hanabi.agents.human_agent import HumanPlayer
-from hanabi.agents.timing import configure_default_distribution
-from hanabi.agents.timing import get_delay
-from hanabi.card import Color
-from hanabi.card import Rank
+from hanabi.agents.inference import BatchActingAgent
+from hanabi.agents.inference import inference_service
+from hanabi.config.game import MAX_SEED
 from hanabi.config.game import HanabiGameConfig
 from hanabi.config.research import HanabiResearchConfig
 from hanabi.config.server import HanabiServerConfig
-from hanabi.game import SSEHanabiGame
+from hanabi.game import IllegalMoveError
+from hanabi.metrics import CONTENT_TYPE
+from hanabi.metrics import ServerMetrics
 from hanabi.moves import Move
-from hanabi.observations import Hand
+from hanabi.moves import sanitize_move
+from hanabi.room import DEFAULT_ROOM
+from hanabi.room import HanabiRoom
+from hanabi.room import InvalidRoomIdError
+from hanabi.room import InvalidSeatError
+from hanabi.room import validate_room_id
+from hanabi.snapshot import RoomSnapshot
+from hanabi.snapshot import set_aside
+from hanabi.snapshot import snapshot_files
+from hanabi.speculation import Speculation
+from hanabi.speculation import speculative_replies
 
 
 log = getLogger(__name__)
 
+T = TypeVar("T")
+
+# seconds between checks whether a move chosen in another thread is ready
+_MOVE_POLL_INTERVAL = 0.001
+# seconds between checks for rooms nobody is connected to anymore
+_IDLE_CHECK_INTERVAL = 10.0
+
+# options which must not be changed per room, e.g. to not let clients choose arbitrary paths
+_FIXED_ROOM_OPTIONS = frozenset({"players", "record_file"})
+
+# pyhanabi aborts the whole process on configs out of these ranges
+_MIN_PLAYERS = 2
+_MAX_PLAYERS = 5
+_MAX_COLORS = 5
+_MAX_RANKS = 5
+
+
+def _is_int(value: Any, minimum: int, maximum: int | None = None) -> bool:  # noqa: ANN401
+    return (
+        isinstance(value, int)
+        and not isinstance(value, bool)
+        and minimum <= value
+        and (maximum is None or value <= maximum)
+    )
+
+
+def _is_duration(value: Any) -> bool:  # noqa: ANN401
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value < float("inf")
+
+
+def _is_bool(value: Any) -> bool:  # noqa: ANN401
+    return isinstance(value, bool)
+
+
+def _is_choice(value: Any, choices: Sequence[str]) -> bool:  # noqa: ANN401
+    return isinstance(value, str) and value in choices
+
+
+def _is_player_list(value: Any) -> bool:  # noqa: ANN401
+    return (
+        isinstance(value, list)
+        and _MIN_PLAYERS <= len(value) <= _MAX_PLAYERS
+        and all(isinstance(player, str) for player in value)
+    )
+
+
+# option -> check of its value and what the check expects
+_ROOM_OPTION_CHECKS: dict[str, tuple[Callable[[Any], bool], str]] = {
+    "player_list": (_is_player_list, f"a list of {_MIN_PLAYERS} to {_MAX_PLAYERS} agent names"),
+    "colors": (partial(_is_int, minimum=1, maximum=_MAX_COLORS), f"an integer from 1 to {_MAX_COLORS}"),
+    "ranks": (partial(_is_int, minimum=1, maximum=_MAX_RANKS), f"an integer from 1 to {_MAX_RANKS}"),
+    "hand_size": (partial(_is_int, minimum=1), "a positive integer"),
+    "max_information_tokens": (partial(_is_int, minimum=0), "a non-negative integer"),
+    "max_life_tokens": (partial(_is_int, minimum=0), "a non-negative integer"),
+    "seed": (partial(_is_int, minimum=-1, maximum=MAX_SEED), f"-1 or an integer up to {MAX_SEED}"),
+    "random_start_player": (_is_bool, "a boolean"),
+    "rainbow_type": (partial(_is_choice, choices=RAINBOW_TYPES), f"one of {', '.join(RAINBOW_TYPES)}"),
+    "rainbow_backend": (partial(_is_choice, choices=RAINBOW_BACKENDS), f"one of {', '.join(RAINBOW_BACKENDS)}"),
+    "minimum_response_time": (_is_duration, "a non-negative number of seconds"),
+    "mean": (_is_duration, "a non-negative number of seconds"),
+    "standard_deviation": (_is_duration, "a non-negative number of seconds"),
+    "always_show_full_knowledge": (_is_bool, "a boolean"),
+    "only_show_last_n_discards": (partial(_is_int, minimum=-1), "-1 or a non-negative integer"),
+    "only_show_last_n_events": (partial(_is_int, minimum=-1), "-1 or a non-negative integer"),
+    "disable_discard_pile": (_is_bool, "a boolean"),
+    "record_fsync_interval": (_is_duration, "a non-negative number of seconds"),
+    "record_max_bytes": (lambda value: value is None or _is_int(value, minimum=1), "null or a positive integer"),
+    "binary_record": (_is_bool, "a boolean"),
+}
+
+
+class UnknownRoomOptionError(Exception):
+    def __init__(self, option: str) -> None:
+        self.option = option
+        super().__init__(f"Room option {option!r} is unknown or cannot be changed per room!")
+
+
+class InvalidRoomOptionError(Exception):
+    def __init__(self, option: str, value: Any, expected: str) -> None:  # noqa: ANN401
+        self.option = option
+        super().__init__(f"Room option {option!r} has to be {expected}, not {value!r}!")
+
+
+def _check_hand_size(game_config: HanabiGameConfig) -> None:
+    """Every hand has to be dealt from the deck, which pyhanabi does not check either."""
+    deck_game = HanabiGame({**game_config, "hand_size": 1, "seed": 0})
+    deck_size = sum(
+        deck_game.num_cards(color, rank)
+        for color in range(game_config["colors"])
+        for rank in range(game_config["ranks"])
+    )
+    if (hand_size := game_config["hand_size"]) * game_config["players"] > deck_size:
+        expected = f"at most {deck_size // game_config['players']} for a deck of {deck_size} cards"
+        raise InvalidRoomOptionError("hand_size", hand_size, expected)  # noqa: EM101
+
 
 def _get_static_folder() -> Path:
     return Path(__file__).parent / "html/static"
@@ -70,6 +195,7 @@ class HanabiServer:
         start_immediately: bool = True,
     ) -> None:
         self._config = config
+        self._game_config = game_config
         self._research_config = research_config
 
         self._app = Flask(
@@ -79,14 +205,16 @@ class HanabiServer:
         )
         self._socketio = SocketIO(self._app, cors_allowed_origins="*")
 
-        configure_default_distribution(research_config)
-
-        self._game = SSEHanabiGame(game_config, research_config.player_list)
-        self._players = [agent(game_config) for agent in research_config.player_list]
-        self._last_moves: dict[int, list[Move]] = {idx: [] for idx in range(len(self._players))}
-        self._agent_lock = Lock()
-
-        log.info("Playing a game with: %s", [a.__class__.__name__ for a in self._players])
+        self._metrics = ServerMetrics()
+        self._agent_executor = ThreadPoolExecutor(config.agent_workers, thread_name_prefix="hanabi-agent")
+        self._rooms: dict[str, HanabiRoom] = {}
+        self._connection_rooms: dict[str, str] = {}
+        if config.snapshot_directory is not None:
+            self._restore_rooms(config.snapshot_directory)
+        if (default_room := self._rooms.get(DEFAULT_ROOM)) is None:
+            default_room = self._create_room(DEFAULT_ROOM, game_config, research_config)
+        if config.warm_up_agents:
+            default_room.warm_up_agents()
 
         self._add_endpoints()
 
@@ -94,6 +222,7 @@ class HanabiServer:
             self._start()
 
     def _start(self) -> None:
+        self._socketio.start_background_task(self._reclaim_idle_rooms)
         self._socketio.run(
             app=self._app,
             host=self._config.host,
@@ -102,13 +231,20 @@ class HanabiServer:
 
     def _add_endpoints(self) -> None:
         self._app.add_url_rule("/shutdown", "shutdown", self._shutdown)
+        self._app.add_url_rule("/rooms", "list_rooms", self._list_rooms, methods=["GET"])
+        self._app.add_url_rule("/rooms/<room_id>", "open_room", self._open_room, methods=["POST"])
+        self._app.add_url_rule("/rooms/<room_id>", "delete_room", self._delete_room, methods=["DELETE"])
+        self._app.add_url_rule("/metrics", "metrics", self._get_metrics, methods=["GET"])
         self._app.add_url_rule("/<int:_>", "index", self._index)
+        self._app.add_url_rule("/<room_id>/<int:_>", "room_index", self._room_index)
         self._app.add_url_rule("/", "player_choose_page", self._player_choose_page)
 
         # TODO(ms): double "connect" / "init" necessary/sensible?
-        self._socketio.on_event("connect", self._on_init)  # no clue if data is possible here
+        self._socketio.on_event("connect", self._on_init)  # receives the socket.io auth payload
         self._socketio.on_event("init", self._on_init)
+        self._socketio.on_event("disconnect", self._on_disconnect)
         self._socketio.on_event("move", self._on_move)
+        self._socketio.on_event("resync", self._on_resync)
         self._socketio.on_event("shutdown", self._shutdown)
 
     def _player_choose_page(self) -> Any:  # noqa: ANN401
@@ -117,185 +253,402 @@ class HanabiServer:
     def _index(self, _: int) -> Any:  # noqa: ANN401
         return self._app.send_static_file("index.html")
 
+    def _room_index(self, room_id: str, _: int) -> Any:  # noqa: ANN401
+        try:
+            validate_room_id(room_id)
+        except InvalidRoomIdError as e:
+            return str(e), 400
+
+        return self._app.send_static_file("index.html")
+
     def _shutdown(self) -> Any:  # noqa: ANN401
         log.info("Received shutdown request...")
         self._socketio.stop()
+        self._agent_executor.shutdown(wait=False, cancel_futures=True)
         self._record()
 
         return "Server shutting down..."
 
     def _record(self) -> None:
-        log.info("Writing record log")
-        self._game.recorder.write_log(self._research_config.record_file)
+        for room in self._rooms.values():
+            room.record()
 
-    def _on_init(self, data: Any) -> None:  # noqa: ANN401
-        log.info("Got an init request, data: %s", data)
-        self._emit_game_state()
+    def _get_metrics(self) -> Any:  # noqa: ANN401
+        return Response(self._metrics.registry.render(), content_type=CONTENT_TYPE)
+
+    def _list_rooms(self) -> Any:  # noqa: ANN401
+        return jsonify(
+            {
+                room_id: {
+                    "players": [a.__class__.__name__ for a in room.players],
+                    "connections": len(room.connections),
+                    "terminal": room.game.is_terminal(),
+                }
+                for room_id, room in self._rooms.items()
+            },
+        )
 
-        self._handle_next_agent()
+    def _open_room(self, room_id: str) -> Any:  # noqa: ANN401
+        if room_id in self._rooms and not self._rooms[room_id].is_abandoned:
+            return f"Room {room_id!r} is already in use", 409
 
-    def _is_revealed(self, player: int, fact: Rank | Color | None) -> bool:
-        if isinstance(fact, int):
-            return any(
-                last_move["rank"] == fact
-                for last_move in self._last_moves[player]
-                if last_move["action_type"] == "REVEAL_RANK"
-            )
+        try:
+            game_config, research_config = self._room_configs(request.get_json(silent=True) or {})
+            room = self._create_room(room_id, game_config, research_config)
+        except (InvalidRoomIdError, UnknownRoomOptionError, InvalidRoomOptionError, AgentNotFoundError) as e:
+            return str(e), 400
 
-        return any(
-            last_move["color"] == fact
-            for last_move in self._last_moves[player]
-            if last_move["action_type"] == "REVEAL_COLOR"
+        return (
+            jsonify(
+                {
+                    "room": room.room_id,
+                    "players": [a.__class__.__name__ for a in room.players],
+                    "seats": [f"/{room.room_id}/{idx + 1}" for idx in range(len(room.players))],
+                },
+            ),
+            201,
         )
 
-    def _correct_knowledge(self, player: int, card_knowledge: list[Hand]) -> list[Hand]:
-        # we only want to manipulate the knowledge for idx=0 as this is players own hand
-        own_hand: Hand = [
-            {
-                "rank": card["rank"] if self._is_revealed(player, card["rank"]) else -1,
-                "color": card["color"] if self._is_revealed(player, card["color"]) else None,
-            }
-            for card in card_knowledge[0]
-        ]
-
-        return [own_hand, *card_knowledge[1:]]
-
-    def _emit_game_state(self) -> None:
-        log.debug("Trying to emit game state")
-        for player in range(len(self._players)):
-            log.debug(
-                "Player %s specific observations: %s",
-                player,
-                observation := self._game.get_observation(player),
-            )
+    def _delete_room(self, room_id: str) -> Any:  # noqa: ANN401
+        if (room := self._rooms.get(room_id)) is None:
+            return f"Room {room_id!r} does not exist", 404
 
-            if not self._research_config.always_show_full_knowledge:
-                observation["card_knowledge"] = self._correct_knowledge(
-                    player, observation["card_knowledge"]
-                )
+        self._close_room(room)
+        return "", 204
+
+    def _room_configs(self, options: dict[str, Any]) -> tuple[HanabiGameConfig, HanabiResearchConfig]:
+        game_config: HanabiGameConfig = {**self._game_config}
+        research_options: dict[str, Any] = {}
 
-            if self._research_config.disable_discard_pile:
-                observation["discard_pile"] = None
-            elif (
-                self._research_config.only_show_last_n_discards > -1
-                and observation["discard_pile"] is not None
-            ):
-                observation["discard_pile"] = observation["discard_pile"][
-                    -self._research_config.only_show_last_n_discards :
-                ]
-
-            if self._research_config.only_show_last_n_events > -1:
-                observation["event_log"] = observation["event_log"][
-                    -self._research_config.only_show_last_n_events :
-                ]
-
-            emit(
-                "game_state",
-                {"player_id": player, "observation": observation},
-                broadcast=True,
+        for option, value in options.items():
+            if option in _FIXED_ROOM_OPTIONS or option not in _ROOM_OPTION_CHECKS:
+                raise UnknownRoomOptionError(option)
+
+            is_valid, expected = _ROOM_OPTION_CHECKS[option]
+            if not is_valid(value):
+                raise InvalidRoomOptionError(option, value, expected)
+
+            if option == "player_list":
+                research_options["player_list"] = get_players(value)
+                game_config["players"] = len(value)
+            elif option in game_config:
+                game_config[option] = value  # type: ignore[literal-required]
+            else:
+                research_options[option] = value
+
+        _check_hand_size(game_config)
+        return game_config, replace(self._research_config, **research_options)
+
+    def _create_room(
+        self,
+        room_id: str,
+        game_config: HanabiGameConfig,
+        research_config: HanabiResearchConfig,
+    ) -> HanabiRoom:
+        if (previous := self._rooms.get(room_id)) is not None:
+            self._close_room(previous)
+
+        room = HanabiRoom(room_id, game_config, research_config, snapshot_directory=self._config.snapshot_directory)
+        self._rooms[room.room_id] = room
+        self._metrics.games_started.inc()
+        return room
+
+    def _restore_rooms(self, snapshot_directory: Path) -> None:
+        for path in snapshot_files(snapshot_directory):
+            start = perf_counter()
+            try:
+                snapshot = RoomSnapshot.load(path)
+                room = HanabiRoom.restore(snapshot, self._research_config, snapshot_directory)
+            except Exception:  # noqa: PERF203
+                # one broken snapshot must neither keep the server from starting nor the other rooms from restoring
+                log.exception("Could not restore the room of %s, moved it to %s", path, set_aside(path))
+                continue
+
+            log.info(
+                "Restored room %s after %d moves in %.1f ms",
+                room.room_id,
+                len(snapshot.moves),
+                (perf_counter() - start) * 1000,
             )
+            self._rooms[room.room_id] = room
+            if room.game.is_terminal():
+                # nobody would ever leave it, the recording of its game is complete anyway
+                self._close_room(room)
+
+    def _close_room(self, room: HanabiRoom) -> None:
+        log.info("Closing room %s", room.room_id)
+        room.record()
+        room.discard_snapshot()
+        room.speculation = None
+
+        for connection in room.connections:
+            self._connection_rooms.pop(connection, None)
+        self._socketio.close_room(room.room_id)
+
+        if self._rooms.get(room.room_id) is room:
+            del self._rooms[room.room_id]
+
+    def _join(self, connection: str, room_id: str, seat: Any) -> tuple[HanabiRoom, int]:  # noqa: ANN401
+        room = self._rooms.get(validate_room_id(room_id))
+        if room is None:
+            room = self._create_room(room_id, self._game_config, self._research_config)
+        player = room.validate_seat(seat)
+
+        self._leave(connection, disconnected=False)
+
+        join_room(room.room_id)
+        join_room(room.seat_channel(player))
+        room.connections[connection] = player
+        self._connection_rooms[connection] = room.room_id
+        return room, player
+
+    def _leave(self, connection: str, *, disconnected: bool) -> None:
+        if (room_id := self._connection_rooms.pop(connection, None)) is None:
+            return
+
+        if (room := self._rooms.get(room_id)) is None:
+            return
+
+        player = room.connections.pop(connection)
+        if not room.connections:
+            room.idle_since = monotonic()
+        if not disconnected:
+            leave_room(room.room_id)
+            leave_room(room.seat_channel(player))
+
+        if room.is_abandoned:
+            self._close_room(room)
+
+    def _reclaim_idle_rooms(self) -> None:
+        while True:
+            self._socketio.sleep(_IDLE_CHECK_INTERVAL)
+            self._close_idle_rooms()
+
+    def _close_idle_rooms(self) -> None:
+        # also rooms left during their game, which would otherwise keep their recorder and agents forever
+        for room in list(self._rooms.values()):
+            if room.is_idle(self._config.room_idle_timeout):
+                log.info("Reclaiming room %s, nobody was connected for a while", room.room_id)
+                self._close_room(room)
+
+    def _room_of(self, connection: str) -> HanabiRoom | None:
+        room_id = self._connection_rooms.get(connection)
+        return None if room_id is None else self._rooms.get(room_id)
+
+    def _on_init(self, data: Any) -> None:  # noqa: ANN401
+        log.info("Got an init request, data: %s", data)
+        if not isinstance(data, dict):
+            data = {}
+
+        connection: str = request.sid  # type: ignore[attr-defined]
+        try:
+            room, player = self._join(connection, str(data.get("room", DEFAULT_ROOM)), data.get("player_id"))
+        except (InvalidRoomIdError, InvalidSeatError) as e:
+            raise ConnectionRefusedError(str(e)) from e
+
+        # only the new connection needs the current state, everybody else already has it
+        self._emit_seat_state(room, player, to=connection, keyframe=True)
+        self._emit_game_ended(room, to=connection)
+        self._start_next_agent(room)
+
+    def _on_resync(self, _: Any = None) -> None:  # noqa: ANN401
+        connection: str = request.sid  # type: ignore[attr-defined]
+        if (room := self._room_of(connection)) is None:
+            return
+
+        log.debug("Client %s asked for a keyframe", connection)
+        self._emit_seat_state(room, room.connections[connection], to=connection, keyframe=True)
 
-            log.debug("Emitted successfully for player: %s", player)
+    def _on_disconnect(self) -> None:
+        log.info("Client %s disconnected", request.sid)  # type: ignore[attr-defined]
+        self._leave(request.sid, disconnected=True)  # type: ignore[attr-defined]
 
-        if self._game.is_terminal():
-            reason = self._game.game_end_status()
-            score = self._game.score()
+    def _emit_seat_state(self, room: HanabiRoom, player: int, to: str, *, keyframe: bool) -> None:
+        delta = self._config.delta_game_state
+        interval = self._config.keyframe_interval
+        periodic_keyframe = interval > 0 and room.game.version % interval == 0
+
+        if delta and not keyframe and not periodic_keyframe and (patch := room.patch(player)) is not None:
+            self._socketio.emit("game_state_patch", patch, to=to)
+        else:
+            self._socketio.emit("game_state", room.keyframe(player, remember=delta), to=to)
+
+        log.debug("Emitted successfully for player: %s", player)
+
+    def _emit_game_state(self, room: HanabiRoom) -> None:
+        log.debug("Trying to emit game state of room %s", room.room_id)
+        # observations are only built for seats somebody watches and each one only reaches its own seat
+        for player in room.watched_seats:
+            self._emit_seat_state(room, player, to=room.seat_channel(player), keyframe=False)
+
+        self._emit_game_ended(room, to=room.room_id)
+
+    def _emit_game_ended(self, room: HanabiRoom, to: str) -> None:
+        if room.game.is_terminal():
+            reason = room.game.game_end_status()
+            score = room.game.score()
             log.debug("Sending GAME_ENDED event with reason: %s | score: %s", reason, score)
-            emit(
+            self._socketio.emit(
                 "game_ended",
                 {
                     "reason": reason,
                     "score": score,
-                    "max_score": self._game.max_score,
+                    "max_score": room.game.max_score,
                 },
-                broadcast=True,
+                to=to,
             )
 
-    def _update_move_lists(self, player: int, move: Move) -> None:
-        for idx in range(len(self._players)):
-            if idx == player:
-                # clear player who made a move
-                self._last_moves[idx] = []
-                continue
+    def _on_move(self, move: Move) -> None:
+        if (room := self._room_of(request.sid)) is None:  # type: ignore[attr-defined]
+            log.warning("Ignoring move %s from client without a room", move)
+            return
 
-            # TODO(ms): move could reveal something not on my side
-            self._last_moves[idx].append(move)
+        # a client may only move for its own seat, and only while no agent is choosing a move of the same turn
+        seat = room.connections[request.sid]  # type: ignore[attr-defined]
+        if seat != room.game.current_player or room.current_agent is not None:
+            log.warning("Ignoring move %s of seat %d in room %s, it is not its turn", move, seat, room.room_id)
+            return
 
-    def _on_move(
-        self, move: Move, *, agent: bool = False
-    ) -> None:
-        log.info("Got move, data: %s, by agent? %s", move, agent)
+        self._make_move(room, move)
 
-        player_that_moved = self._game.current_player
+    def _make_move(self, room: HanabiRoom, move: Move, *, agent: bool = False) -> None:
+        log.info("Got move in room %s, data: %s, by agent? %s", room.room_id, move, agent)
+
+        player_that_moved = room.game.current_player
+        agent_name = room.players[player_that_moved].__class__.__name__
+        speculation = None if agent else self._select_speculation(room, move)
+        phase_seconds = self._metrics.phase_seconds
         try:
-            self._game.make_move(move)
-        except AssertionError:
+            # includes building the observations for the recording, which is written by its own thread
+            with phase_seconds.time("make_move", agent_name):
+                room.game.make_move(move)
+        except IllegalMoveError:
             log.exception("Ignoring illegal move %s from agent %s, could break game!", move, agent)
+            self._metrics.illegal_moves.inc(agent_name)
+            if not agent:
+                # the same player is still to move, the speculation on their move was dropped with it
+                self._start_next_agent(room)
+            return
+
+        self._metrics.moves.inc(agent_name)
+        room.save_move(move)
 
-        if not self._research_config.always_show_full_knowledge:
-            log.debug("Update last moves knowledge")
-            self._update_move_lists(player_that_moved, move)
-            log.debug("Update finished")
+        log.debug("Update last moves knowledge")
+        room.update_move_lists(player_that_moved, move)
 
         log.debug("Moved successfully")
-        self._emit_game_state()
+        with phase_seconds.time("emit", agent_name):
+            self._emit_game_state(room)
         log.debug("Emmitted new game state")
 
-        if self._game.is_terminal():
-            log.info("Game has ended with reason: %s", self._game.game_end_status())
-            self._record()
+        if room.game.is_terminal():
+            end_status = room.game.game_end_status()
+            log.info("Game in room %s has ended with reason: %s", room.room_id, end_status)
+            self._metrics.games_finished.inc(end_status.name)
+            with phase_seconds.time("record", agent_name):
+                room.record()
+            if room.is_abandoned:
+                self._close_room(room)
             return
 
         if not agent:
-            self._handle_next_agent()
-            log.debug("Handled all non-human agents")
-
-    @staticmethod
-    def _sanitize_move(move: Move) -> Move:
-        if move["action_type"] == "PLAY" or move["action_type"] == "DISCARD":
-            return {  # type: ignore[return-value]
-                "action_type": move["action_type"],
-                "card_index": int(move["card_index"]),
-            }
-
-        if move["action_type"] == "REVEAL_COLOR":
-            return {
-                "action_type": move["action_type"],
-                "color": str(move["color"]),
-                "target_offset": int(move["target_offset"]),
-            }
-
-        if move["action_type"] == "REVEAL_RANK":
-            return {
-                "action_type": move["action_type"],
-                "rank": int(move["rank"]),
-                "target_offset": int(move["target_offset"]),
-            }
-
-        # this is completely unreachable according to mypy but other linters
-        # have problems understanding types
-        msg = f"move={move!r} has no recognized type"  # type: ignore[unreachable]
-        raise ValueError(msg)
-
-    def _handle_next_agent(self) -> None:
-        if self._agent_lock.locked():
+            self._start_next_agent(room, speculation)
+
+    def _start_next_agent(self, room: HanabiRoom, speculation: Speculation | None = None) -> None:
+        if room.current_agent is None:
+            self._speculate(room)
+        elif not room.agent_lock.locked():
+            # agents play in the background so a room with slow agents never blocks the handlers of other rooms
+            self._socketio.start_background_task(self._handle_next_agent, room, speculation)
+
+    def _speculate(self, room: HanabiRoom) -> None:
+        limit = self._config.speculative_replies
+        game = room.game
+        if limit == 0 or game.is_terminal():
             return
+        if room.speculation is not None and room.speculation.version == game.version:
+            return
+
+        next_agent = room.players[(game.current_player + 1) % len(room.players)]
+        if isinstance(next_agent, HumanPlayer) or not (hints := game.hypothetical_hints(limit)):
+            return
+
+        log.debug("Speculating about %d hints in room %s", len(hints), room.room_id)
+        replies = self._agent_executor.submit(speculative_replies, next_agent, hints)
+        room.speculation = Speculation(game.version, replies)
+
+    def _select_speculation(self, room: HanabiRoom, move: Move) -> Speculation | None:
+        if (speculation := room.speculation) is None:
+            return None
+
+        room.speculation = None
+        if speculation.select(room.game.version, room.game.move_uid(move)):
+            return speculation
 
-        with self._agent_lock:
-            while (
-                not isinstance((agent := self._players[self._game.current_player]), HumanPlayer)
-                and not self._game.is_terminal()
-            ):
+        self._metrics.speculative_replies.inc("miss")
+        return None
+
+    def _speculative_reply(self, room: HanabiRoom, speculation: Speculation) -> Move | None:
+        while not speculation.replies.done():
+            self._socketio.sleep(_MOVE_POLL_INTERVAL)
+
+        if (reply := speculation.reply()) is None:
+            self._metrics.speculative_replies.inc("miss")
+            return None
+
+        # continue with the agent which chose the reply, it may have learned from the observation
+        agent, move = reply
+        room.players[room.game.current_player] = agent
+        self._metrics.speculative_replies.inc("hit")
+        return move
+
+    def _choose_move(self, room: HanabiRoom, agent: Agent) -> Move:
+        agent_name = agent.__class__.__name__
+        phase_seconds = self._metrics.phase_seconds
+        with phase_seconds.time("observation", agent_name):
+            observation = room.game.get_agent_observation(room.game.current_player)
+
+        with phase_seconds.time("act", agent_name):
+            if isinstance(agent, BatchActingAgent):
+                # batch with the agents of the other rooms
+                return self._wait(inference_service().submit(agent, observation))
+
+            return self._wait(self._agent_executor.submit(agent.act, observation))  # type: ignore[no-any-return]
+
+    def _wait(self, future: Future[T]) -> T:
+        # without blocking the event loop, which keeps serving the clients of all rooms meanwhile
+        while not future.done():
+            self._socketio.sleep(_MOVE_POLL_INTERVAL)
+        return future.result()
+
+    def _handle_next_agent(self, room: HanabiRoom, speculation: Speculation | None = None) -> None:
+        if room.agent_lock.locked():
+            return
+
+        with room.agent_lock:
+            while (agent := room.current_agent) is not None:
                 log.debug("Next agent: %s", agent)
-                move = self._sanitize_move(
-                    agent.act(self._game.get_agent_observation(self._game.current_player)),
-                )
-                delay = get_delay(agent)
+                version = room.game.version
+                start = perf_counter()
+                reply = None if speculation is None else self._speculative_reply(room, speculation)
+                speculation = None
+                move = sanitize_move(self._choose_move(room, agent) if reply is None else reply)
+                # the timing distribution is the total response time, choosing the move already took some of it
+                thinking = perf_counter() - start
+                delay = max(room.get_delay(agent) - thinking, 0)
                 log.info(
-                    "Agent %s chose move %s, executing with delay: %5.2f",
+                    "Agent %s chose move %s in %5.2f, executing with delay: %5.2f",
                     agent.__class__.__name__,
                     move,
+                    thinking,
                     delay,
                 )
-                self._socketio.sleep(delay)
-                self._on_move(move, agent=True)
+                with self._metrics.phase_seconds.time("delay", agent.__class__.__name__):
+                    self._socketio.sleep(delay)
+                if room.game.version != version:
+                    log.warning("Dropping move %s of agent %s, the game changed meanwhile", move, agent)
+                    continue
+                self._make_move(room, move, agent=True)
+
+            log.debug("Handled all non-human agents of room %s", room.room_id)
+            self._speculate(room)
@@ -0,0 +1,205 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import os
+import random
+import time
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from logging import getLogger
+from statistics import mean
+from statistics import pstdev
+
+from hanabi_learning_environment.rl_env import Agent
+
+from hanabi.agents.human_agent import HumanPlayer
+from hanabi.config.game import MAX_SEED
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.simulation import HanabiSimulationConfig
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import sanitize_move
+
+
+log = getLogger(__name__)
+
+
+class HumanPlayerCannotBeSimulatedError(Exception):
+    def __init__(self) -> None:
+        super().__init__("Simulations can only be run with non-human agents.")
+
+
+@dataclass()
+class GameResult:
+    seed: int
+    score: int
+    moves: int
+    end_status: str
+
+
+@dataclass()
+class SimulationReport:
+    results: list[GameResult]
+    duration_seconds: float
+
+    @property
+    def scores(self) -> list[int]:
+        return [result.score for result in self.results]
+
+    @property
+    def games_per_second(self) -> float:
+        return len(self.results) / self.duration_seconds if self.duration_seconds > 0 else float("inf")
+
+    def score_distribution(self) -> dict[int, int]:
+        return dict(sorted(Counter(self.scores).items()))
+
+    def log_summary(self) -> None:
+        scores = self.scores
+        log.info(
+            "Simulated %d games in %.2fs (%.1f games/s)",
+            len(scores),
+            self.duration_seconds,
+            self.games_per_second,
+        )
+        log.info(
+            "Score mean: %.2f | std: %.2f | min: %d | max: %d",
+            mean(scores),
+            pstdev(scores),
+            min(scores),
+            max(scores),
+        )
+        for score, count in self.score_distribution().items():
+            log.info("Score %2d: %6d games (%5.1f%%)", score, count, 100 * count / len(scores))
+
+
+def play_game(
+    config: HanabiGameConfig,
+    player_list: list[type[Agent]],
+    *,
+    agent_configs: list[HanabiGameConfig] | None = None,
+) -> GameResult:
+    """
+    Play a single game without any server or artificial delay between the agents' moves.
+
+    Every agent is created with its entry of `agent_configs` instead of `config` if given, e.g. so that two
+    rainbow agents of different types can play together.
+    """
+    # rule based agents draw from the global generator, seed it too to make a game reproducible
+    random.seed(config["seed"])
+
+    game = SSEHanabiGame(config, player_list)
+    agents = [
+        agent(agent_config) for agent, agent_config in zip(player_list, agent_configs or [config] * len(player_list))
+    ]
+
+    moves = 0
+    while not game.is_terminal():
+        player = game.current_player
+        game.make_move(sanitize_move(agents[player].act(game.get_agent_observation(player))))
+        moves += 1
+
+    return GameResult(
+        seed=config["seed"],
+        score=int(game.score()),
+        moves=moves,
+        end_status=game.game_end_status().name,
+    )
+
+
+def _play_seeded_game(config: HanabiGameConfig, player_list: list[type[Agent]], seed: int) -> GameResult:
+    return play_game({**config, "seed": seed}, player_list)
+
+
+def game_seeds(config: HanabiGameConfig, games: int) -> list[int]:
+    base_seed = config["seed"]
+    if base_seed < 0:
+        base_seed = random.SystemRandom().randrange(MAX_SEED - games)
+
+    return [base_seed + idx for idx in range(games)]
+
+
+def _simulate_batched(  # noqa: PLR0913
+    executor: ProcessPoolExecutor,
+    workers: int,
+    config: HanabiGameConfig,
+    player_list: list[type[Agent]],
+    seeds: list[int],
+    batch_size: int,
+) -> list[GameResult]:
+    # late import, the batched environment builds on this module's results
+    from hanabi.batched import play_batched
+
+    chunk_size = max(batch_size, -(-len(seeds) // workers))
+    chunks = [seeds[idx : idx + chunk_size] for idx in range(0, len(seeds), chunk_size)]
+    return [
+        result
+        for results in executor.map(partial(play_batched, config, player_list, batch_size=batch_size), chunks)
+        for result in results
+    ]
+
+
+def simulate(
+    config: HanabiGameConfig,
+    player_list: list[type[Agent]],
+    simulation_config: HanabiSimulationConfig,
+) -> SimulationReport:
+    if any(issubclass(player, HumanPlayer) for player in player_list):
+        raise HumanPlayerCannotBeSimulatedError
+
+    seeds = game_seeds(config, simulation_config.games)
+    log.info(
+        "Simulating %d games with %s, seeds %d..%d",
+        len(seeds),
+        [p.__name__ for p in player_list],
+        seeds[0],
+        seeds[-1],
+    )
+
+    workers = simulation_config.workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if simulation_config.batch_size > 1:
+            results = _simulate_batched(executor, workers, config, player_list, seeds, simulation_config.batch_size)
+        else:
+            results = list(
+                executor.map(
+                    partial(_play_seeded_game, config, player_list),
+                    seeds,
+                    chunksize=max(1, len(seeds) // (workers * 4)),
+                ),
+            )
+
+    return SimulationReport(results=results, duration_seconds=time.perf_counter() - start)
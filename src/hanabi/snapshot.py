@@ -0,0 +1,144 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import json
+import os
+
+from dataclasses import dataclass
+from dataclasses import field
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+
+from hanabi.config.game import HanabiGameConfig
+
+
+log = getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".snapshot.jsonl"
+# appended to snapshots which could not be restored, they are kept for inspection
+BROKEN_SNAPSHOT_SUFFIX = ".broken"
+
+
+class InvalidSnapshotError(Exception):
+    def __init__(self, path: Path) -> None:
+        super().__init__(f"{path} is not a room snapshot!")
+
+
+def snapshot_file(directory: Path, room_id: str) -> Path:
+    return directory / f"{room_id}{SNAPSHOT_SUFFIX}"
+
+
+@dataclass()
+class RoomSnapshot:
+    """
+    Everything needed to rebuild a room: its configs and the moves of its game so far.
+
+    The game is dealt from the concrete seed of its config, so replaying the moves restores the
+    cards, and with them the knowledge revealed to every player.
+    """
+
+    room_id: str
+    game_config: HanabiGameConfig
+    # names of the agents in the agent registry
+    players: list[str]
+    # research options of the room besides its players and record file
+    research_options: dict[str, Any]
+    # as uids of the game
+    moves: list[int] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path) -> RoomSnapshot:
+        """Load a snapshot, the last move of a server which died while writing it is dropped."""
+        lines = path.read_text().split("\n")
+        try:
+            header = json.loads(lines[0])
+            # every complete line ends with a newline, so the last part is empty or the incomplete move
+            moves = [int(line) for line in lines[1:-1]]
+            return cls(header["room_id"], header["game_config"], header["players"], header["research_options"], moves)
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            raise InvalidSnapshotError(path) from e
+
+    def header(self) -> dict[str, Any]:
+        return {
+            "room_id": self.room_id,
+            "game_config": self.game_config,
+            "players": self.players,
+            "research_options": self.research_options,
+        }
+
+
+class SnapshotWriter:
+    """
+    Keeps the snapshot file of a room up to date.
+
+    The header with the configs is written once and every move appends a single line, which is
+    flushed right away so that it survives a crash of the server. The initial content is written to
+    a temporary file which replaces the snapshot, a crash meanwhile leaves the old snapshot intact.
+    """
+
+    def __init__(self, path: Path, snapshot: RoomSnapshot) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_name(f"{path.name}.tmp")
+        self._file = temporary_path.open("w")
+        self._file.write(json.dumps(snapshot.header()) + "\n")
+        for move_uid in snapshot.moves:
+            self._file.write(f"{move_uid}\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        # the moves are appended to the still open file, which is the snapshot from now on
+        temporary_path.replace(path)
+
+    def add_move(self, move_uid: int) -> None:
+        if self._file.closed:
+            return
+
+        self._file.write(f"{move_uid}\n")
+        self._file.flush()
+
+    def discard(self) -> None:
+        """Stop writing and remove the snapshot, e.g. once its room was closed."""
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+def snapshot_files(directory: Path) -> list[Path]:
+    return sorted(directory.glob(f"*{SNAPSHOT_SUFFIX}"))
+
+
+def set_aside(path: Path) -> Path:
+    """Rename a snapshot which could not be restored, so that it is not restored again."""
+    broken_path = path.with_name(f"{path.name}{BROKEN_SNAPSHOT_SUFFIX}")
+    path.replace(broken_path)
+    return broken_path
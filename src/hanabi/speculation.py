@@ -0,0 +1,95 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import copy
+
+from concurrent.futures import Future
+from logging import getLogger
+from typing import Dict
+from typing import Tuple
+
+from hanabi_learning_environment.rl_env import Agent
+
+from hanabi.agents.inference import BatchActingAgent
+from hanabi.agents.inference import act_batched
+from hanabi.game import HypotheticalHint
+from hanabi.moves import Move
+
+
+log = getLogger(__name__)
+
+# agent which chose the reply, with the state it has after choosing it, and the reply by the uid of the hint
+SpeculativeReplies = Dict[int, Tuple[Agent, Move]]
+
+
+def speculative_replies(agent: Agent, hints: list[HypotheticalHint]) -> SpeculativeReplies:
+    """
+    Let the `agent` choose its replies to all `hints`, with a single `batch_act` if it supports that.
+
+    Agents which may keep state between their moves reply on copies of themselves, so that the
+    agent only changes once it is known which hint was given.
+    """
+    agents = [agent if isinstance(agent, BatchActingAgent) else copy.deepcopy(agent) for _ in hints]
+    moves = act_batched(agents, [hint.observe() for hint in hints])
+    return {hint.move_uid: (reply_agent, move) for hint, reply_agent, move in zip(hints, agents, moves)}
+
+
+class Speculation:
+    """Replies of the agent after a human to the hints the human could give, chosen while the human thinks."""
+
+    def __init__(self, version: int, replies: Future[SpeculativeReplies]) -> None:
+        # version of the game the human is thinking about
+        self.version = version
+        self.replies = replies
+        self._move_uid: int | None = None
+
+    def select(self, version: int, move_uid: int | None) -> bool:
+        """Select the move the human made in `version` and return whether the reply to it is or will be chosen."""
+        if version != self.version or move_uid is None:
+            self.replies.cancel()
+            return False
+
+        self._move_uid = move_uid
+        # only wait for the replies if they are already being chosen, choosing the move from scratch is as fast
+        return not self.replies.cancel()
+
+    def reply(self) -> tuple[Agent, Move] | None:
+        """Reply to the selected move once `replies` is done or None if the move was not speculated about."""
+        if self._move_uid is None:
+            return None
+
+        try:
+            return self.replies.result(timeout=0).get(self._move_uid)
+        except Exception:
+            log.exception("Choosing the speculative replies failed")
+            return None
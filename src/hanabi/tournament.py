@@ -0,0 +1,258 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import json
+import math
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from dataclasses import asdict
+from dataclasses import dataclass
+from itertools import combinations_with_replacement
+from logging import getLogger
+from pathlib import Path
+from statistics import mean
+from statistics import stdev
+from typing import Any
+from typing import Dict
+from typing import Tuple
+
+from hanabi_learning_environment.rl_env import Agent
+
+from hanabi.agents import AGENT_MAP
+from hanabi.agents import RAINBOW_TYPES
+from hanabi.agents import get_players
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.tournament import HanabiTournamentConfig
+from hanabi.simulation import GameResult
+from hanabi.simulation import game_seeds
+from hanabi.simulation import play_game
+
+
+log = getLogger(__name__)
+
+# participants of rainbow agents are written as "rainbow:<rainbow type>"
+RAINBOW_PARTICIPANT_PREFIX = "rainbow:"
+
+# z-score of the two-sided 95% confidence interval of the mean score
+_Z_95 = 1.96
+
+Pairing = Tuple[str, str]
+ResultLine = Dict[str, Any]
+
+
+class TournamentConfigMismatchError(Exception):
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        super().__init__(f"Results in {path!s} were played with a different game configuration!")
+
+
+@dataclass()
+class ScoreSummary:
+    games: int
+    mean: float
+    # half width of the 95% confidence interval of the mean
+    confidence: float
+
+    @classmethod
+    def of(cls, scores: list[int]) -> ScoreSummary:
+        confidence = _Z_95 * stdev(scores) / math.sqrt(len(scores)) if len(scores) > 1 else math.inf
+        return cls(games=len(scores), mean=mean(scores), confidence=confidence)
+
+    def __str__(self) -> str:
+        return f"{self.mean:.2f} ± {self.confidence:.2f}"
+
+
+def default_participants() -> list[str]:
+    return [
+        *(name for name in AGENT_MAP if name not in ("human", "rainbow")),
+        *(f"{RAINBOW_PARTICIPANT_PREFIX}{rainbow_type}" for rainbow_type in RAINBOW_TYPES),
+    ]
+
+
+def _player(participant: str, config: HanabiGameConfig) -> tuple[type[Agent], HanabiGameConfig]:
+    name, _, rainbow_type = participant.partition(":")
+    agent = get_players([name])[0]
+    return agent, {**config, "rainbow_type": rainbow_type} if rainbow_type else config
+
+
+def _has_checkpoint(participant: str) -> bool:
+    if not participant.startswith(RAINBOW_PARTICIPANT_PREFIX):
+        return True
+
+    # only tournaments with rainbow agents pay for importing torch
+    from hanabi.agents.external.rainbow_agent import DEFAULT_CHECKPOINTS_PATH
+    from hanabi.agents.external.rainbow_agent import network_path
+
+    rainbow_type = participant[len(RAINBOW_PARTICIPANT_PREFIX) :]
+    if network_path(DEFAULT_CHECKPOINTS_PATH, rainbow_type).exists():
+        return True
+
+    log.warning("Skipping %s, there is no checkpoint for it", participant)
+    return False
+
+
+def _pairing_key(first: str, second: str) -> Pairing:
+    """Order the participants of a pairing by name, so that it does not depend on the order they were listed in."""
+    return (first, second) if first <= second else (second, first)
+
+
+def play_pairing(config: HanabiGameConfig, pairing: Pairing, seeds: list[int]) -> list[GameResult]:
+    players = [_player(participant, config) for participant in pairing]
+    return [
+        play_game(
+            {**config, "seed": seed},
+            [agent for agent, _ in players],
+            agent_configs=[{**agent_config, "seed": seed} for _, agent_config in players],
+        )
+        for seed in seeds
+    ]
+
+
+class TournamentResults:
+    """
+    Results of a tournament, persisted as JSON lines so that an interrupted tournament continues where it stopped.
+
+    The first line holds the game configuration and the first seed, every further line the result of one game of a
+    pairing. A random seed is drawn once, a continued tournament plays on the seeds of the first run.
+    """
+
+    def __init__(self, path: Path, config: HanabiGameConfig, games: int) -> None:
+        self.path = path
+        self.scores: dict[Pairing, dict[int, int]] = {}
+
+        if not path.exists():
+            self.seeds = game_seeds(config, games)
+            with path.open("w") as results_file:
+                results_file.write(json.dumps({"game_config": config, "base_seed": self.seeds[0]}) + "\n")
+            return
+
+        data = path.read_bytes()
+        if (complete := data.rfind(b"\n") + 1) < len(data):
+            # the last line of an interrupted tournament may be incomplete, drop it so that new results start on a line
+            log.warning("Dropping incomplete result in %s: %r", path, data[complete:])
+            os.truncate(path, complete)
+
+        lines = data[:complete].decode().splitlines()
+        header = json.loads(lines[0])
+        if header["game_config"] != json.loads(json.dumps(config)):
+            raise TournamentConfigMismatchError(path)
+
+        self.seeds = game_seeds({**config, "seed": header["base_seed"]}, games)
+
+        for line in lines[1:]:
+            result: ResultLine = json.loads(line)
+            first, second = result["pairing"]
+            self._add((first, second), result["seed"], result["score"])
+
+    def _add(self, pairing: Pairing, seed: int, score: int) -> None:
+        self.scores.setdefault(_pairing_key(*pairing), {})[seed] = score
+
+    def missing_seeds(self, pairing: Pairing, seeds: list[int]) -> list[int]:
+        played = self.scores.get(_pairing_key(*pairing), {})
+        return [seed for seed in seeds if seed not in played]
+
+    def append(self, pairing: Pairing, results: list[GameResult]) -> None:
+        with self.path.open("a") as results_file:
+            for result in results:
+                results_file.write(json.dumps({"pairing": pairing, **asdict(result)}) + "\n")
+            results_file.flush()
+            os.fsync(results_file.fileno())
+
+        for result in results:
+            self._add(pairing, result.seed, result.score)
+
+    def matrix(self) -> dict[Pairing, ScoreSummary]:
+        """Score summary of every pairing in both seat orders, over the seeds of the current run only."""
+        summaries = {}
+        for (first, second), scores in self.scores.items():
+            if seed_scores := [scores[seed] for seed in self.seeds if seed in scores]:
+                summaries[first, second] = summaries[second, first] = ScoreSummary.of(seed_scores)
+
+        return summaries
+
+    def write_matrix(self, path: Path, participants: list[str]) -> None:
+        matrix = self.matrix()
+        with path.open("w") as matrix_file:
+            matrix_file.write(",".join(["", *participants]) + "\n")
+            for first in participants:
+                cells = [str(matrix.get((first, second), "")) for second in participants]
+                matrix_file.write(",".join([first, *cells]) + "\n")
+
+    def log_summary(self) -> None:
+        for pairing, summary in sorted(self.matrix().items()):
+            if pairing[0] <= pairing[1]:
+                log.info("%s vs %s: %s over %d games", *pairing, summary, summary.games)
+
+
+def tournament(config: HanabiGameConfig, tournament_config: HanabiTournamentConfig) -> TournamentResults:
+    """Play every pairing of the participants on the same seeds, skipping the games of earlier runs."""
+    # pairings are two player games, whatever the player list of the game options says
+    config = {**config, "players": 2}
+    participants = [
+        participant
+        for participant in tournament_config.participants or default_participants()
+        if _has_checkpoint(participant)
+    ]
+    results = TournamentResults(tournament_config.results_file, config, tournament_config.games)
+    seeds = results.seeds
+
+    # chunk by chunk for all pairings, so that an interrupted tournament has results for every pairing
+    chunk_size = tournament_config.chunk_size
+    work = [
+        (pairing, missing)
+        for idx in range(0, len(seeds), chunk_size)
+        # sorted, so that the seats of a pairing do not depend on the order of the participants either
+        for pairing in combinations_with_replacement(sorted(participants), 2)
+        if (missing := results.missing_seeds(pairing, seeds[idx : idx + chunk_size]))
+    ]
+    log.info(
+        "Playing %d games of %d participants, seeds %d..%d",
+        sum(len(missing) for _, missing in work),
+        len(participants),
+        seeds[0],
+        seeds[-1],
+    )
+
+    workers = tournament_config.workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(play_pairing, config, pairing, missing): pairing for pairing, missing in work}
+        for done, future in enumerate(as_completed(futures), start=1):
+            results.append(futures[future], future.result())
+            log.debug("Finished %d of %d chunks", done, len(futures))
+
+    if tournament_config.matrix_file is not None:
+        results.write_matrix(tournament_config.matrix_file, participants)
+
+    return results
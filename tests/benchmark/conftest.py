@@ -0,0 +1,219 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import json
+import platform
+import random
+import time
+
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import mean
+from statistics import median
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+import pytest
+
+from hanabi.agents import get_players
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.game import default_game_config
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import Move
+from hanabi.moves import sanitize_move
+
+
+PLAYER_COUNTS = [2, 3, 4, 5]
+# moves played before a benchmark, from the first move to the late game
+GAME_LENGTHS = [0, 20, 50]
+
+# the official hand size is 5 cards for up to 3 players and 4 cards for more
+_MAX_PLAYERS_WITH_FIVE_CARDS = 3
+
+# seconds one round of a benchmark should at least take, short functions are called repeatedly per round
+_MIN_ROUND_TIME = 0.01
+_ROUNDS = 5
+
+_TIMINGS = pytest.StashKey[Dict[str, "Timing"]]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--benchmark-json",
+        type=Path,
+        default=None,
+        help="Write the timings of all benchmarks as baseline into this file",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        type=Path,
+        default=None,
+        help="Fail benchmarks which got slower than in this baseline",
+    )
+    group.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=0.5,
+        help="Slowdown relative to the baseline which still passes",
+    )
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    # every benchmark of a game is run for all player counts and game lengths, unless it chooses its own
+    parametrized = {
+        name.strip()
+        for marker in metafunc.definition.iter_markers("parametrize")
+        for name in (marker.args[0].split(",") if isinstance(marker.args[0], str) else marker.args[0])
+    }
+    if "players" in metafunc.fixturenames and "players" not in parametrized:
+        metafunc.parametrize("players", PLAYER_COUNTS)
+    if "game_length" in metafunc.fixturenames and "game_length" not in parametrized:
+        metafunc.parametrize("game_length", GAME_LENGTHS)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[_TIMINGS] = {}
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    path: Path | None = session.config.getoption("benchmark_json")
+    if path is None or not (timings := session.config.stash[_TIMINGS]):
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "machine": platform.platform(),
+                "python": platform.python_version(),
+                "benchmarks": {name: asdict(timing) for name, timing in sorted(timings.items())},
+            },
+            indent=2,
+        ),
+    )
+
+
+@dataclass()
+class Timing:
+    rounds: int
+    iterations: int
+    # seconds per call
+    minimum: float
+    median: float
+    mean: float
+
+
+class BenchmarkRegressionError(Exception):
+    def __init__(self, name: str, timing: Timing, baseline: float, tolerance: float) -> None:
+        super().__init__(
+            f"{name} takes {timing.median * 1e6:.1f}us, "
+            f"more than {100 * tolerance:.0f}% slower than the baseline {baseline * 1e6:.1f}us",
+        )
+
+
+class Benchmark:
+    def __init__(self, name: str, timings: dict[str, Timing], baseline: float | None, tolerance: float) -> None:
+        self._name = name
+        self._timings = timings
+        self._baseline = baseline
+        self._tolerance = tolerance
+
+    def __call__(self, function: Callable[..., Any], *args: Any) -> Any:  # noqa: ANN401
+        """Time `function(*args)` and return its result, it must be repeatable, e.g. not consume its arguments."""
+        start = time.perf_counter()
+        result = function(*args)
+        iterations = max(1, int(_MIN_ROUND_TIME / max(time.perf_counter() - start, 1e-9)))
+
+        durations = []
+        for _ in range(_ROUNDS):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                function(*args)
+            durations.append((time.perf_counter() - start) / iterations)
+
+        timing = Timing(
+            rounds=_ROUNDS,
+            iterations=iterations,
+            minimum=min(durations),
+            median=median(durations),
+            mean=mean(durations),
+        )
+        self._timings[self._name] = timing
+
+        if self._baseline is not None and timing.median > self._baseline * (1 + self._tolerance):
+            raise BenchmarkRegressionError(self._name, timing, self._baseline, self._tolerance)
+
+        return result
+
+
+@pytest.fixture()
+def benchmark(request: pytest.FixtureRequest) -> Benchmark:
+    name = request.node.nodeid
+    baseline_path: Path | None = request.config.getoption("benchmark_baseline")
+
+    baseline = None
+    if baseline_path is not None and baseline_path.exists():
+        benchmarks = json.loads(baseline_path.read_text())["benchmarks"]
+        baseline = benchmarks[name]["median"] if name in benchmarks else None
+
+    return Benchmark(name, request.config.stash[_TIMINGS], baseline, request.config.getoption("benchmark_tolerance"))
+
+
+def game_config(players: int) -> HanabiGameConfig:
+    hand_size = 5 if players <= _MAX_PLAYERS_WITH_FIVE_CARDS else 4
+    return {**default_game_config(players), "hand_size": hand_size, "seed": 0}
+
+
+def _play(config: HanabiGameConfig, moves: int) -> tuple[SSEHanabiGame, list[Move]]:
+    """Let piers agents play up to `moves` moves of a game and return the game and the moves played."""
+    random.seed(config["seed"])
+    player_list = get_players(["piers"] * config["players"])
+    game = SSEHanabiGame(config, player_list)
+    agents = [agent(config) for agent in player_list]
+
+    played = []
+    while len(played) < moves and not game.is_terminal():
+        player = game.current_player
+        move = sanitize_move(agents[player].act(game.get_agent_observation(player)))
+        game.make_move(move)
+        played.append(move)
+
+    return game, played
+
+
+@pytest.fixture()
+def played_game(players: int, game_length: int) -> tuple[SSEHanabiGame, list[Move]]:
+    return _play(game_config(players), game_length)
@@ -0,0 +1,108 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import random
+
+from typing import Any
+from typing import Callable
+
+import pytest
+
+from hanabi.agents import AGENT_MAP
+from hanabi.agents.external.ruleset import ObservationContext
+from hanabi.agents.external.ruleset import Ruleset
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import Move
+
+
+RULES: dict[str, Callable[[Any], Move | None]] = {
+    **{
+        name: getattr(Ruleset, name)
+        for name, rule in vars(Ruleset).items()
+        if isinstance(rule, staticmethod) and not name.endswith("_factory")
+    },
+    # the factories with their default parameters
+    "tell_dispensable": Ruleset.tell_dispensable_factory(),
+    "play_probably_safe": Ruleset.play_probably_safe_factory(),
+    "discard_probably_useless": Ruleset.discard_probably_useless_factory(),
+}
+
+RULE_BASED_AGENTS = [name for name in AGENT_MAP if name not in ("human", "rainbow")]
+
+
+def _current_observation(game: SSEHanabiGame) -> Any:  # noqa: ANN401
+    if game.is_terminal():
+        pytest.skip("the game ended before")
+
+    random.seed(0)
+    return game.get_agent_observation(game.current_player)
+
+
+@pytest.mark.parametrize("rule", sorted(RULES))
+def test_rule(benchmark: Callable[..., Any], played_game: tuple[SSEHanabiGame, list[Move]], rule: str) -> None:
+    observation = _current_observation(played_game[0])
+
+    # a new context for every call, otherwise everything the rule derives would be memoized
+    benchmark(lambda: RULES[rule](ObservationContext(observation)))
+
+
+@pytest.mark.parametrize("agent", RULE_BASED_AGENTS)
+def test_rule_based_agent(
+    benchmark: Callable[..., Any],
+    played_game: tuple[SSEHanabiGame, list[Move]],
+    agent: str,
+) -> None:
+    game = played_game[0]
+    observation = _current_observation(game)
+    agent_type = AGENT_MAP[agent]
+
+    # a new agent for every call, so agents tracking the game catch up with all of it like in a new game
+    benchmark(lambda: agent_type(game.config).act(observation))
+
+
+@pytest.mark.parametrize("players", [2])
+def test_rainbow_agent(benchmark: Callable[..., Any], played_game: tuple[SSEHanabiGame, list[Move]]) -> None:
+    pytest.importorskip("torch")
+    from hanabi.agents.external.rainbow_agent import DEFAULT_CHECKPOINTS_PATH
+    from hanabi.agents.external.rainbow_agent import TrainedRainbowAgent
+    from hanabi.agents.external.rainbow_agent import network_path
+
+    game = played_game[0]
+    config = {**game.config, "rainbow_type": "aiide_all1"}
+    if not network_path(DEFAULT_CHECKPOINTS_PATH, config["rainbow_type"]).exists():
+        pytest.skip("no rainbow checkpoint")
+
+    agent = TrainedRainbowAgent(config)
+    observation = _current_observation(game)
+
+    benchmark(agent.act, observation)
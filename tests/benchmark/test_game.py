@@ -0,0 +1,77 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from typing import Any
+from typing import Callable
+
+from hanabi.agents import get_players
+from hanabi.config.game import HanabiGameConfig
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import Move
+from hanabi.observations import PlayerSpecificObservation
+from hanabi.observations import from_hanabi_observation
+from hanabi_learning_environment.rl_env import Agent
+
+
+def _build_observation(game: SSEHanabiGame, player: int) -> PlayerSpecificObservation:
+    state = game._hanabi_state  # noqa: SLF001
+    return from_hanabi_observation(
+        game.current_player,
+        state.fireworks(),
+        state.observation(player),
+        game._env,  # noqa: SLF001
+        game.event_log,
+    )
+
+
+def _replay(config: HanabiGameConfig, player_list: list[type[Agent]], moves: list[Move]) -> SSEHanabiGame:
+    game = SSEHanabiGame(config, player_list)
+    for move in moves:
+        game.make_move(move)
+
+    return game
+
+
+def test_from_hanabi_observation(benchmark: Callable[..., Any], played_game: tuple[SSEHanabiGame, list[Move]]) -> None:
+    game, _ = played_game
+
+    benchmark(_build_observation, game, 0)
+
+
+def test_make_move(benchmark: Callable[..., Any], played_game: tuple[SSEHanabiGame, list[Move]]) -> None:
+    """Deal a game and replay its moves, including the observations every move records."""
+    game, moves = played_game
+
+    replayed = benchmark(_replay, game.config, get_players(["piers"] * game.config["players"]), moves)
+
+    assert replayed.version == len(moves)
@@ -0,0 +1,75 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+from typing import Callable
+
+import pytest
+
+
+# seconds `import hanabi.cli` may take, everything up to the pyhanabi bindings takes about 0.2s
+CLI_IMPORT_BUDGET = 1.0
+
+_HEAVY_MODULES = ("torch", "flask", "flask_socketio", "pkg_resources")
+
+
+def _import(module: str) -> tuple[float, set[str]]:
+    """Import `module` in a fresh interpreter and return the time it took and all modules imported with it."""
+    script = (
+        "import json, sys, time\n"
+        "before = set(sys.modules)\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(json.dumps([time.perf_counter() - start, sorted(set(sys.modules) - before)]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, check=True, text=True)  # noqa: S603
+    duration, modules = json.loads(result.stdout)
+    return duration, set(modules)
+
+
+@pytest.mark.parametrize("heavy_module", _HEAVY_MODULES)
+def test_cli_defers_heavy_imports(heavy_module: str) -> None:
+    _, modules = _import("hanabi.cli")
+
+    assert heavy_module not in modules
+
+
+def test_cli_import_time(record_property: Callable[[str, object], None]) -> None:
+    duration = min(_import("hanabi.cli")[0] for _ in range(3))
+    # kept in the junit report
+    record_property("import_seconds", round(duration, 3))
+
+    assert duration < CLI_IMPORT_BUDGET
@@ -0,0 +1,94 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+from typing import Callable
+
+import pytest
+
+from hanabi.agents import get_players
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.research import HanabiResearchConfig
+from hanabi.config.server import HanabiServerConfig
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import Move
+from hanabi.room import DEFAULT_ROOM
+from hanabi.server import HanabiServer
+
+
+def _research_config(players: int, record_file: Path) -> HanabiResearchConfig:
+    return HanabiResearchConfig(
+        record_file=record_file,
+        player_list=get_players(["human"] + ["piers"] * (players - 1)),
+        minimum_response_time=0,
+        mean=0,
+        standard_deviation=0,
+        always_show_full_knowledge=False,
+        only_show_last_n_discards=-1,
+        only_show_last_n_events=-1,
+        disable_discard_pile=False,
+    )
+
+
+@pytest.mark.parametrize("delta_game_state", [False, True])
+def test_emit_game_state(
+    benchmark: Callable[..., Any],
+    played_game: tuple[SSEHanabiGame, list[Move]],
+    delta_game_state: bool,  # noqa: FBT001
+    tmp_path: Path,
+) -> None:
+    """Emit the state of a game with a client on every seat, building their observations from scratch."""
+    game, moves = played_game
+    config: HanabiGameConfig = game.config
+    server = HanabiServer(
+        HanabiServerConfig(delta_game_state=delta_game_state),
+        config,
+        _research_config(config["players"], tmp_path / "records.csv"),
+        start_immediately=False,
+    )
+    room = server._rooms[DEFAULT_ROOM]  # noqa: SLF001
+    for move in moves:
+        room.game.make_move(move)
+    for seat in range(config["players"]):
+        room.connections[f"client-{seat}"] = seat
+
+    def emit() -> None:
+        room.game._observations.clear()  # noqa: SLF001
+        server._emit_game_state(room)  # noqa: SLF001
+
+    try:
+        benchmark(emit)
+    finally:
+        # stops the thread streaming the records of the room
+        room.record()
@@ -0,0 +1,241 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import random
+
+from pathlib import Path
+from typing import Any
+from typing import Iterator
+
+import pytest
+
+from hanabi.agents import get_players
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.game import default_game_config
+from hanabi.config.research import HanabiResearchConfig
+from hanabi.config.server import HanabiServerConfig
+from hanabi.protocol import GameStatePatchMessage
+from hanabi.protocol import ObservationSnapshot
+from hanabi.protocol import diff_observation
+from hanabi.protocol import snapshot_observation
+from hanabi.room import DEFAULT_ROOM
+from hanabi.room import HanabiRoom
+from hanabi.server import HanabiServer
+
+
+PLAYER = 1
+BASE_VERSION = 3
+VERSION = 4
+KEYFRAME_INTERVAL = 3
+EVENT_WINDOW = 2
+MOVES = 30
+
+
+def _game_config() -> HanabiGameConfig:
+    return {**default_game_config(), "hand_size": 5, "seed": 0}
+
+
+def _research_config(record_file: Path, event_window: int = -1) -> HanabiResearchConfig:
+    return HanabiResearchConfig(
+        record_file=record_file,
+        player_list=get_players(["human", "human"]),
+        minimum_response_time=0,
+        mean=0,
+        standard_deviation=0,
+        always_show_full_knowledge=False,
+        only_show_last_n_discards=-1,
+        only_show_last_n_events=event_window,
+        disable_discard_pile=False,
+    )
+
+
+@pytest.fixture()
+def room(tmp_path: Path, request: pytest.FixtureRequest) -> Iterator[HanabiRoom]:
+    event_window: int = getattr(request, "param", -1)
+    room = HanabiRoom(DEFAULT_ROOM, _game_config(), _research_config(tmp_path / "records.csv", event_window))
+    yield room
+    # stops the thread streaming the records of the room
+    room.record()
+
+
+def _apply(state: ObservationSnapshot, patch: GameStatePatchMessage) -> ObservationSnapshot:
+    """Apply a patch like a client does."""
+    state = {**state, **patch["set"]}
+    for key, values in patch["append"].items():
+        state[key] = [*state[key], *values]
+    return state
+
+
+def _make_random_move(room: HanabiRoom, rng: random.Random) -> None:
+    observation = room.game.get_observation(room.game.current_player)
+    room.game.make_move(rng.choice(observation["legal_moves"]))
+
+
+def test_snapshot_copies_lists() -> None:
+    observation: Any = {"event_log": [1, 2], "score": 0}
+    snapshot = snapshot_observation(observation)
+    observation["event_log"].append(3)
+
+    assert snapshot == {"event_log": [1, 2], "score": 0}
+
+
+def test_diff_sets_changed_values_only() -> None:
+    base = {"score": 0, "life_tokens": 3, "discard_pile": None}
+    observation: Any = {"score": 1, "life_tokens": 3, "discard_pile": ["R1"]}
+
+    patch = diff_observation(PLAYER, BASE_VERSION, base, VERSION, observation)
+
+    assert patch == {
+        "player_id": PLAYER,
+        "version": VERSION,
+        "base_version": BASE_VERSION,
+        "set": {"score": 1, "discard_pile": ["R1"]},
+        "append": {},
+    }
+
+
+def test_diff_appends_to_grown_lists() -> None:
+    base = {"event_log": ["a", "b"]}
+    observation: Any = {"event_log": ["a", "b", "c", "d"]}
+
+    patch = diff_observation(PLAYER, BASE_VERSION, base, VERSION, observation)
+
+    assert patch["set"] == {}
+    assert patch["append"] == {"event_log": ["c", "d"]}
+    assert _apply(base, patch) == observation
+
+
+@pytest.mark.parametrize(
+    "new_events",
+    [
+        # a window moving on by one event keeps its length but not its start
+        ["b", "c", "d"],
+        # a window which only just started to drop events shrinks meanwhile
+        ["c"],
+        # the start changed although the list grew
+        ["x", "b", "c", "d"],
+    ],
+)
+def test_diff_sets_lists_which_do_not_only_grow(new_events: list[str]) -> None:
+    base = {"event_log": ["a", "b", "c"]}
+    observation: Any = {"event_log": new_events}
+
+    patch = diff_observation(PLAYER, BASE_VERSION, base, VERSION, observation)
+
+    assert patch["set"] == {"event_log": new_events}
+    assert patch["append"] == {}
+    assert _apply(base, patch) == observation
+
+
+@pytest.mark.parametrize("room", [-1, EVENT_WINDOW], indirect=True)
+def test_patches_follow_the_game(room: HanabiRoom) -> None:
+    rng = random.Random(0)
+    keyframe = room.keyframe(PLAYER, remember=True)
+    version, state = keyframe["version"], snapshot_observation(keyframe["observation"])
+
+    for _ in range(MOVES):
+        if room.game.is_terminal():
+            break
+        _make_random_move(room, rng)
+        patch = room.patch(PLAYER)
+
+        assert patch is not None
+        assert patch["base_version"] == version
+        version, state = patch["version"], _apply(state, patch)
+        assert version == room.game.version
+        assert state == room.get_client_observation(PLAYER)
+
+
+def test_seat_without_keyframe_gets_no_patch(room: HanabiRoom) -> None:
+    room.keyframe(PLAYER, remember=False)
+
+    assert room.patch(PLAYER) is None
+
+
+def test_resync_after_missed_patch(room: HanabiRoom) -> None:
+    rng = random.Random(0)
+    keyframe = room.keyframe(PLAYER, remember=True)
+    version = keyframe["version"]
+
+    # the client misses the patch of this move
+    _make_random_move(room, rng)
+    assert room.patch(PLAYER) is not None
+    _make_random_move(room, rng)
+    patch = room.patch(PLAYER)
+
+    # it does not fit the client's version, which asks for a keyframe instead
+    assert patch is not None
+    assert patch["base_version"] != version
+    keyframe = room.keyframe(PLAYER, remember=True)
+    version, state = keyframe["version"], snapshot_observation(keyframe["observation"])
+
+    _make_random_move(room, rng)
+    patch = room.patch(PLAYER)
+    assert patch is not None
+    assert patch["base_version"] == version
+    assert _apply(state, patch) == room.get_client_observation(PLAYER)
+
+
+def test_keyframe_interval(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    server = HanabiServer(
+        HanabiServerConfig(delta_game_state=True, keyframe_interval=KEYFRAME_INTERVAL, warm_up_agents=False),
+        _game_config(),
+        _research_config(tmp_path / "records.csv"),
+        start_immediately=False,
+    )
+    room = server._rooms[DEFAULT_ROOM]  # noqa: SLF001
+    room.connections["client"] = PLAYER
+
+    events: list[tuple[str, int]] = []
+
+    def emit(event: str, message: dict[str, Any], to: str) -> None:
+        if to == room.seat_channel(PLAYER) and event in ("game_state", "game_state_patch"):
+            events.append((event, message["version"]))
+
+    monkeypatch.setattr(server._socketio, "emit", emit)  # noqa: SLF001
+
+    rng = random.Random(0)
+    try:
+        server._emit_game_state(room)  # noqa: SLF001
+        for _ in range(MOVES):
+            if room.game.is_terminal():
+                break
+            _make_random_move(room, rng)
+            server._emit_game_state(room)  # noqa: SLF001
+    finally:
+        room.record()
+
+    assert len(events) > KEYFRAME_INTERVAL
+    for event, version in events:
+        periodic_keyframe = version % KEYFRAME_INTERVAL == 0
+        assert event == ("game_state" if periodic_keyframe else "game_state_patch")
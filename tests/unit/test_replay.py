@@ -0,0 +1,120 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import random
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from hanabi.agents import get_players
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.game import default_game_config
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import sanitize_move
+from hanabi.recording import BINARY_RECORD_SUFFIX
+from hanabi.recording import BinaryRecordWriter
+from hanabi.recording import HanabiRecorder
+from hanabi.recording import HanabiRecordReader
+from hanabi.replay import HanabiReplay
+from hanabi.replay import UnreplayableGameError
+
+
+PLAYERS = 3
+SEED = 7
+
+
+def _game_config() -> HanabiGameConfig:
+    return {**default_game_config(PLAYERS), "hand_size": 5, "seed": SEED}
+
+
+@pytest.fixture(scope="module")
+def recorded_game(tmp_path_factory: pytest.TempPathFactory) -> tuple[Path, list[list[Any]], list[list[list[int]]]]:
+    """Play a game of piers agents into a binary record, with the live observations and encodings of every turn."""
+    config = _game_config()
+    record_file = tmp_path_factory.mktemp("replay") / "records.csv"
+    player_list = get_players(["piers"] * PLAYERS)
+    recorder = HanabiRecorder(
+        record_file,
+        binary_writer=BinaryRecordWriter(
+            record_file.with_suffix(BINARY_RECORD_SUFFIX),
+            config,
+            [agent.__name__ for agent in player_list],
+        ),
+    )
+
+    random.seed(SEED)
+    game = SSEHanabiGame(config, player_list, recorder=recorder)
+    agents = [agent(config) for agent in player_list]
+    observations = []
+    vectorized = []
+    while True:
+        observations.append([game.get_observation(player) for player in range(PLAYERS)])
+        vectorized.append([list(game.get_agent_observation(player)["vectorized"]) for player in range(PLAYERS)])
+        if game.is_terminal():
+            break
+        player = game.current_player
+        game.make_move(sanitize_move(agents[player].act(game.get_agent_observation(player))))
+
+    recorder.close(wait=True)
+    return record_file.with_suffix(BINARY_RECORD_SUFFIX), observations, vectorized
+
+
+@pytest.mark.parametrize("checkpoint_interval", [1, 3, 10, 1000])
+def test_replay_matches_live_game(
+    recorded_game: tuple[Path, list[list[Any]], list[list[list[int]]]],
+    checkpoint_interval: int,
+) -> None:
+    record_file, observations, vectorized = recorded_game
+    record = HanabiRecordReader(record_file)
+    replay = HanabiReplay.from_record(record, checkpoint_interval=checkpoint_interval)
+
+    assert len(replay) == len(record) == len(observations)
+    for turn in range(len(replay)):
+        for player in range(PLAYERS):
+            assert replay.observation(turn, player) == observations[turn][player]
+            assert replay.vectorized(turn, player) == vectorized[turn][player]
+            assert list(record[turn].vectorized[player]) == vectorized[turn][player]
+
+
+def test_turns_are_out_of_range_beyond_the_game(recorded_game: tuple[Path, Any, Any]) -> None:
+    replay = HanabiReplay.from_record(HanabiRecordReader(recorded_game[0]))
+
+    with pytest.raises(IndexError):
+        replay.state(len(replay))
+
+
+def test_random_seed_is_unreplayable() -> None:
+    with pytest.raises(UnreplayableGameError):
+        HanabiReplay({**_game_config(), "seed": -1}, [])
@@ -0,0 +1,190 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import gc
+import random
+
+from typing import Any
+
+import numpy as np
+import pytest
+
+from hanabi.agents import get_players
+from hanabi.agents.external.ruleset import BeliefTracker
+from hanabi.agents.external.ruleset import HandBelief
+from hanabi.agents.external.ruleset import ObservationContext
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.game import default_game_config
+from hanabi.game import SSEHanabiGame
+from hanabi.moves import Move
+from hanabi.moves import sanitize_move
+
+
+PLAYERS = 2
+MOVES = 40
+SHORT_EVENT_LOG = 3
+# successful plays and misfires of a game
+PLAYS = 2
+
+
+def _observations(seed: int) -> list[dict[str, Any]]:
+    """Observations of the current player during a game of random hints and discards, which never ends early."""
+    config: HanabiGameConfig = {**default_game_config(PLAYERS), "hand_size": 5, "seed": seed}
+    game = SSEHanabiGame(config, get_players(["random"] * PLAYERS))
+    rng = random.Random(seed)
+
+    observations: list[dict[str, Any]] = []
+    while len(observations) < MOVES and not game.is_terminal():
+        observation = game.get_agent_observation(game.current_player)
+        observations.append(dict(observation))
+        moves = [move for move in observation["legal_moves"] if move["action_type"] != "PLAY"]
+        game.make_move(rng.choice(moves))
+
+    return observations
+
+
+def _observations_with_plays(seed: int) -> list[dict[str, Any]]:
+    """Observations of the current player during a game with successful plays as well as misfires."""
+    config: HanabiGameConfig = {**default_game_config(PLAYERS), "hand_size": 5, "seed": seed}
+    game = SSEHanabiGame(config, get_players(["random"] * PLAYERS))
+    rng = random.Random(seed)
+
+    observations: list[dict[str, Any]] = []
+    plays = {True: 0, False: 0}
+    while len(observations) < MOVES and not game.is_terminal():
+        player = game.current_player
+        observation: dict[str, Any] = dict(game.get_agent_observation(player))
+        observations.append(observation)
+
+        # the next player sees the hand of the current one
+        hand = game.get_agent_observation((player + 1) % PLAYERS)["observed_hands"][-1]
+        playable = [card["rank"] == observation["fireworks"][card["color"]] for card in hand]
+        for successful in (True, False):
+            if plays[successful] < PLAYS and successful in playable:
+                plays[successful] += 1
+                move: Move = {"action_type": "PLAY", "card_index": playable.index(successful), "played_card": None}
+                break
+        else:
+            move = rng.choice([legal for legal in observation["legal_moves"] if legal["action_type"] != "PLAY"])
+        game.make_move(move)
+
+    assert plays == {True: PLAYS, False: PLAYS}
+    return observations
+
+
+def _assert_matches_fresh_context(beliefs: BeliefTracker, observation: dict[str, Any]) -> None:
+    context = ObservationContext(observation)
+    np.testing.assert_array_equal(beliefs.discarded, context.discarded)
+    np.testing.assert_array_equal(beliefs.max_fireworks, context.max_fireworks_array)
+
+
+def test_updates_follow_a_game() -> None:
+    beliefs = BeliefTracker()
+    observations = _observations(seed=0)
+    for observation in observations:
+        beliefs.update(observation)
+        _assert_matches_fresh_context(beliefs, observation)
+
+    assert beliefs.discarded.sum() > 0
+
+
+def test_updates_follow_plays_and_misfires(monkeypatch: pytest.MonkeyPatch) -> None:
+    observations = _observations_with_plays(seed=0)
+    beliefs = BeliefTracker()
+    beliefs.update(observations[0])
+
+    def rebuild(observation: dict[str, Any]) -> None:
+        pytest.fail(f"rebuilt from {observation}")
+
+    # every later update consumes the events
+    monkeypatch.setattr(beliefs, "_rebuild_from", rebuild)
+    for observation in observations[1:]:
+        beliefs.update(observation)
+        _assert_matches_fresh_context(beliefs, observation)
+        hand = HandBelief(observation)
+        np.testing.assert_array_equal(beliefs._fireworks, hand.fireworks)  # noqa: SLF001
+        np.testing.assert_array_equal(beliefs.max_fireworks, hand.max_fireworks)
+
+
+def test_rebuilds_for_a_new_game() -> None:
+    beliefs = BeliefTracker()
+    for observation in _observations(seed=0):
+        beliefs.update(observation)
+
+    for observation in _observations(seed=1):
+        beliefs.update(observation)
+        _assert_matches_fresh_context(beliefs, observation)
+
+
+@pytest.mark.parametrize("event_log", [[], None])
+def test_rebuilds_without_complete_event_log(event_log: list[Any] | None) -> None:
+    beliefs = BeliefTracker()
+    observations = _observations(seed=0)
+    for observation in observations[: MOVES // 2]:
+        beliefs.update(observation)
+
+    for observation in observations[MOVES // 2 :]:
+        beliefs.update({**observation, "event_log": event_log})
+        _assert_matches_fresh_context(beliefs, observation)
+
+
+def test_rebuilds_for_a_shorter_event_log() -> None:
+    beliefs = BeliefTracker()
+    observations = _observations(seed=0)
+    for observation in observations[: MOVES // 2]:
+        beliefs.update(observation)
+
+    # e.g. a windowed event log, which no longer grows with the game
+    for observation in observations[MOVES // 2 :]:
+        short = {**observation, "event_log": observation["event_log"][-SHORT_EVENT_LOG:]}
+        beliefs.update(short)
+        _assert_matches_fresh_context(beliefs, short)
+
+
+def test_rulebased_agents_leave_no_reference_cycles() -> None:
+    """Observations hold pyhanabi objects, the cyclic garbage collector must not be needed to free them."""
+    config: HanabiGameConfig = {**default_game_config(PLAYERS), "hand_size": 5, "seed": 0}
+    player_list = get_players(["piers"] * PLAYERS)
+    game = SSEHanabiGame(config, player_list)
+    agents = [agent(config) for agent in player_list]
+
+    gc.collect()
+    gc.disable()
+    try:
+        while not game.is_terminal():
+            player = game.current_player
+            game.make_move(sanitize_move(agents[player].act(game.get_agent_observation(player))))
+
+        assert gc.collect() == 0
+    finally:
+        gc.enable()
@@ -0,0 +1,163 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+from typing import Iterator
+
+import pytest
+
+from hanabi.agents import get_players
+from hanabi.config.game import default_game_config
+from hanabi.config.research import HanabiResearchConfig
+from hanabi.config.server import HanabiServerConfig
+from hanabi.room import HanabiRoom
+from hanabi.server import HanabiServer
+
+
+ROOM = "x2"
+IDLE_TIMEOUT = 60.0
+CREATED = 201
+BAD_REQUEST = 400
+
+
+@pytest.fixture()
+def server(tmp_path: Path) -> Iterator[HanabiServer]:
+    server = HanabiServer(
+        HanabiServerConfig(warm_up_agents=False, room_idle_timeout=IDLE_TIMEOUT),
+        {**default_game_config(), "hand_size": 5},
+        HanabiResearchConfig(
+            record_file=tmp_path / "records.csv",
+            player_list=get_players(["human", "random"]),
+            minimum_response_time=0,
+            mean=0,
+            standard_deviation=0,
+            always_show_full_knowledge=False,
+            only_show_last_n_discards=-1,
+            only_show_last_n_events=-1,
+            disable_discard_pile=False,
+        ),
+        start_immediately=False,
+    )
+    yield server
+    # stops the threads streaming the records of the rooms
+    for room in server._rooms.values():  # noqa: SLF001
+        room.record()
+
+
+def _open_room(server: HanabiServer, options: Any) -> tuple[int, str]:  # noqa: ANN401
+    response = server._app.test_client().post(f"/rooms/{ROOM}", json=options)  # noqa: SLF001
+    return response.status_code, response.get_data(as_text=True)
+
+
+def test_opens_room_with_valid_options(server: HanabiServer) -> None:
+    status, _ = _open_room(server, {"player_list": ["human", "random", "random"], "colors": 3, "seed": 1})
+
+    assert status == CREATED
+    assert ROOM in server._rooms  # noqa: SLF001
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        # each of these aborts the process in pyhanabi
+        {"colors": 9},
+        {"ranks": 0},
+        {"hand_size": 0},
+        {"player_list": ["human"] * 6},
+        {"seed": 2**40},
+        # more cards in the hands than in the deck
+        {"hand_size": 11, "player_list": ["human"] * 5},
+        {"colors": 1, "ranks": 1, "hand_size": 2},
+        # wrong types
+        {"colors": "5"},
+        {"colors": True},
+        {"mean": -1},
+        {"disable_discard_pile": "yes"},
+        {"player_list": "human,random"},
+        {"rainbow_type": "nope"},
+    ],
+)
+def test_rejects_invalid_options(server: HanabiServer, options: dict[str, Any]) -> None:
+    status, message = _open_room(server, options)
+
+    assert status == BAD_REQUEST
+    assert "has to be" in message
+    assert ROOM not in server._rooms  # noqa: SLF001
+
+
+def test_rejects_unknown_agents(server: HanabiServer) -> None:
+    status, message = _open_room(server, {"player_list": ["human", "nope"]})
+
+    assert status == BAD_REQUEST
+    assert "Agent was not found" in message
+    assert ROOM not in server._rooms  # noqa: SLF001
+
+
+def test_reclaims_rooms_left_during_their_game(server: HanabiServer) -> None:
+    _open_room(server, {"player_list": ["human", "random"]})
+    room = server._rooms[ROOM]  # noqa: SLF001
+    room.connections["client"] = 0
+    server._connection_rooms["client"] = ROOM  # noqa: SLF001
+    room.idle_since -= IDLE_TIMEOUT
+
+    # somebody is still connected
+    server._close_idle_rooms()  # noqa: SLF001
+    assert ROOM in server._rooms  # noqa: SLF001
+
+    server._leave("client", disconnected=True)  # noqa: SLF001
+    server._close_idle_rooms()  # noqa: SLF001
+    assert ROOM in server._rooms  # noqa: SLF001
+
+    room.idle_since -= IDLE_TIMEOUT
+    server._close_idle_rooms()  # noqa: SLF001
+    assert ROOM not in server._rooms  # noqa: SLF001
+    assert not room.game.is_terminal()
+    # the recording of the unfinished game is complete once its writer thread is done
+    writer = room.game.recorder._writer  # noqa: SLF001
+    assert writer is not None
+    writer.join()
+    assert room.record_file.read_text().count("\n") > 1
+
+
+def test_ignores_illegal_moves(server: HanabiServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    _open_room(server, {"player_list": ["human", "human"]})
+    room = server._rooms[ROOM]  # noqa: SLF001
+    emitted: list[HanabiRoom] = []
+    monkeypatch.setattr(server, "_emit_game_state", emitted.append)
+
+    server._make_move(room, {"action_type": "PLAY", "card_index": 9, "played_card": None})  # noqa: SLF001
+
+    assert room.game.version == 0
+    assert room._last_moves == {0: [], 1: []}  # noqa: SLF001
+    assert not emitted
@@ -0,0 +1,70 @@
+#
+#  Copyright (c) Honda Research Institute Europe GmbH
+#
+#  Redistribution and use in source and binary forms, with or without
+#  modification, are permitted provided that the following conditions are
+#  met:
+#
+#  1. Redistributions of source code must retain the above copyright notice,
+#     this list of conditions and the following disclaimer.
+#
+#  2. Redistributions in binary form must reproduce the above copyright
+#     notice, this list of conditions and the following disclaimer in the
+#     documentation and/or other materials provided with the distribution.
+#
+#  3. Neither the name of the copyright holder nor the names of its
+#     contributors may be used to endorse or promote products derived from
+#     this software without specific prior written permission.
+#
+#  THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+#  IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+#  THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+#  PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR
+#  CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+#  EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+#  PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+#  PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+#  LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+#  NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+#  SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+#
+#
+from __future__ import annotations
+
+import json
+
+from pathlib import Path
+
+from hanabi.config.game import HanabiGameConfig
+from hanabi.config.game import default_game_config
+from hanabi.config.tournament import HanabiTournamentConfig
+from hanabi.tournament import tournament
+
+
+PARTICIPANTS = ["simple", "legal_random"]
+GAMES = 2
+# the player list of the game options does not matter for a tournament
+LISTED_PLAYERS = 3
+PAIRING_PLAYERS = 2
+
+
+def _tournament(results_file: Path, participants: list[str]) -> list[str]:
+    config: HanabiGameConfig = {**default_game_config(LISTED_PLAYERS), "hand_size": 4, "seed": 0}
+    tournament(config, HanabiTournamentConfig(results_file, participants, games=GAMES, workers=1))
+    return results_file.read_text().splitlines()
+
+
+def test_plays_two_player_pairings(tmp_path: Path) -> None:
+    lines = _tournament(tmp_path / "tournament.jsonl", PARTICIPANTS)
+
+    assert json.loads(lines[0])["game_config"]["players"] == PAIRING_PLAYERS
+    pairings = {tuple(json.loads(line)["pairing"]) for line in lines[1:]}
+    assert pairings == {("legal_random", "legal_random"), ("legal_random", "simple"), ("simple", "simple")}
+    assert len(lines) == 1 + len(pairings) * GAMES
+
+
+def test_continues_with_the_participants_in_another_order(tmp_path: Path) -> None:
+    results_file = tmp_path / "tournament.jsonl"
+    lines = _tournament(results_file, PARTICIPANTS)
+
+    assert _tournament(results_file, PARTICIPANTS[::-1]) == lines